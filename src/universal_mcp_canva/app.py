@@ -1,11 +1,220 @@
+import base64
+import json
+from contextlib import nullcontext
+from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
 from universal_mcp.applications import APIApplication
 from universal_mcp.integrations import Integration
 
+from universal_mcp_canva import workflow
+from universal_mcp_canva.batch import call_with_retry, run_batch, wait_for_job
+from universal_mcp_canva.cache import ResponseCache
+from universal_mcp_canva.catalog import BrandTemplateCatalog
+from universal_mcp_canva.concurrency import AdaptiveLimiter
+from universal_mcp_canva.downloads import DownloadManager
+from universal_mcp_canva.hedging import HedgePolicy
+from universal_mcp_canva.pipeline import Stage, run_pipeline
+from universal_mcp_canva.progress import format_bytes, report_progress_threadsafe
+from universal_mcp_canva.timeouts import EndpointTimeouts, endpoint_family
+from universal_mcp_canva.tracing import Tracer, route_template
+
+# Job status endpoints change while they are polled, and signing keys must be
+# re-fetched when Canva rotates them, so neither is ever cached.
+_UNCACHED_PATHS = (
+    "/v1/asset-uploads/",
+    "/v1/autofills/",
+    "/v1/exports/",
+    "/v1/imports/",
+    "/v1/connect/keys",
+    "/jwks",
+)
+
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 class CanvaApp(APIApplication):
-    def __init__(self, integration: Integration = None, **kwargs) -> None:
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        integration: Integration = None,
+        cache: ResponseCache | None = None,
+        timeouts: EndpointTimeouts | None = None,
+        hedging: HedgePolicy | None = None,
+        transport: httpx.BaseTransport | None = None,
+        tracer: Tracer | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        **kwargs,
+    ) -> None:
         super().__init__(name='canva', integration=integration, **kwargs)
         self.base_url = "https://api.canva.com/rest"
+        self.cache = cache
+        self.timeouts = timeouts or EndpointTimeouts()
+        self.hedging = hedging
+        self.transport = transport
+        self.tracer = tracer
+        self.limiter = limiter
+        self.brand_template_catalog = BrandTemplateCatalog(self)
+        if self._client is not None:
+            self._client.event_hooks["request"].extend(self._request_hooks())
+
+    def _request_hooks(self) -> list:
+        hooks = [self.timeouts.apply]
+        if self.tracer is not None:
+            hooks.append(self.tracer.request_hook)
+        return hooks
+
+    @property
+    def client(self) -> httpx.Client:
+        if not self._client:
+            self._client = httpx.Client(
+                base_url=self.base_url,
+                headers=self._get_headers(),
+                timeout=self.timeouts.default,
+                event_hooks={"request": self._request_hooks()},
+                transport=self.transport,
+            )
+        return self._client
+
+    def _span(self, method: str, url: str, params: dict[str, Any] | None = None):
+        if self.tracer is None:
+            return nullcontext()
+        return self.tracer.span(method, url, params)
+
+    def _traced(self, span, response: httpx.Response) -> httpx.Response:
+        if self.tracer is None:
+            return response
+        return self.tracer.attach(span, response)
+
+    def _slot(self, method: str, url: str):
+        if self.limiter is None:
+            return nullcontext()
+        route = f"{method} {route_template(url)}"
+        return self.limiter.slot(endpoint_family(url), route)
+
+    def _hedge_slot(self, url: str):
+        if self.limiter is None:
+            return None
+        route = f"GET {route_template(url)}"
+        return lambda: self.limiter.try_slot(endpoint_family(url), route)
+
+    def _get(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        cacheable = self.cache is not None and not any(
+            path in url for path in _UNCACHED_PATHS
+        )
+        if cacheable:
+            cached = self.cache.get(url, params)
+            # Cache hits never reach Canva, so they are left out of the trace.
+            if cached is not None:
+                return cached
+        with self._span("GET", url, params) as span:
+            get = super()._get
+
+            # The limiter slot is taken before the hedge clock starts, so only sent
+            # requests are timed, and a hedge goes out only if a slot is free at once.
+            with self._slot("GET", url):
+                if self.hedging is not None:
+                    response = self.hedging.run(
+                        endpoint_family(url),
+                        lambda: get(url, params=params),
+                        hedge_slot=self._hedge_slot(url),
+                    )
+                else:
+                    response = get(url, params=params)
+            if cacheable:
+                self.cache.set(url, params, response)
+            return self._traced(span, response)
+
+    def metrics(self) -> dict[str, Any]:
+        """Returns the cache, hedging, tracing and concurrency statistics."""
+        return {
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "hedging": self.hedging.stats() if self.hedging is not None else None,
+            "tracing": self.tracer.report() if self.tracer is not None else None,
+            "concurrency": self.limiter.stats() if self.limiter is not None else None,
+        }
+
+    def _post(
+        self, url: str, data: Any, params: dict[str, Any] | None = None, **kwargs
+    ) -> httpx.Response:
+        with self._span("POST", url, params) as span, self._slot("POST", url):
+            response = super()._post(url, data=data, params=params, **kwargs)
+            self._invalidate(url, data)
+            return self._traced(span, response)
+
+    def _patch(
+        self, url: str, data: dict[str, Any], params: dict[str, Any] | None = None
+    ) -> httpx.Response:
+        with self._span("PATCH", url, params) as span, self._slot("PATCH", url):
+            response = super()._patch(url, data=data, params=params)
+            self._invalidate(url, data)
+            return self._traced(span, response)
+
+    def _delete(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        with self._span("DELETE", url, params) as span, self._slot("DELETE", url):
+            response = super()._delete(url, params=params)
+            self._invalidate(url)
+            return self._traced(span, response)
+
+    def _invalidate(self, url: str, data: Any = None) -> None:
+        """Drops cached reads under a written path, and those its body affects."""
+        if self.cache is None:
+            return
+        path = urlsplit(url).path
+        self.cache.invalidate(path, prefix=True)
+        base_path = urlsplit(self.base_url).path
+        for related in _affected_paths(path.removeprefix(base_path), data):
+            self.cache.invalidate(f"{base_path}{related}", prefix=True)
+
+    def _upload_file(
+        self,
+        endpoint: str,
+        path: str,
+        metadata_header: str,
+        metadata: dict[str, Any],
+        report: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Streams a local file to an upload endpoint and returns the started job.
+
+        With `report`, upload progress is reported as the first half of the
+        operation's percentage, since the job still has to finish afterwards.
+        """
+        file_path = Path(path)
+        size = file_path.stat().st_size
+        total = format_bytes(size)
+
+        def chunks():
+            sent = 0
+            with file_path.open("rb") as f:
+                while chunk := f.read(_UPLOAD_CHUNK_SIZE):
+                    sent += len(chunk)
+                    if report:
+                        message = f"Uploaded {format_bytes(sent)} of {total}"
+                        report_progress_threadsafe(
+                            50 * sent / max(size, 1), 100, message
+                        )
+                    yield chunk
+
+        headers = {
+            **self._get_headers(),
+            "Content-Type": "application/octet-stream",
+            "Content-Length": str(size),
+            metadata_header: json.dumps(metadata),
+        }
+        url = f"{self.base_url}{endpoint}"
+        with self._span("POST", url) as span, self._slot("POST", url):
+            response = self.client.post(url, content=chunks(), headers=headers)
+            response.raise_for_status()
+            return self._traced(span, response).json()
+
+    def _upload_asset_file(self, path: str, report: bool = False) -> dict[str, Any]:
+        """Starts an asset upload job with the raw bytes of a local file."""
+        name = Path(path).stem[:50]
+        metadata = {"name_base64": base64.b64encode(name.encode()).decode()}
+        return self._upload_file(
+            "/v1/asset-uploads", path, "Asset-Upload-Metadata", metadata, report=report
+        )
 
     def v1_apps_appid_jwks(self, appId) -> dict[str, Any]:
         """
@@ -860,6 +1069,463 @@ class CanvaApp(APIApplication):
         response.raise_for_status()
         return response.json()
 
+    async def batch_get_comments(
+        self, comments: list[dict[str, str]], max_concurrency: int = 8
+    ) -> dict[str, Any]:
+        """
+        Fetches many design comments concurrently and returns them in a compact form.
+
+        Args:
+            comments (array): Comments to fetch, each an object with `design_id` and
+                `comment_id`.
+                Example:
+                ```json
+                [
+                  {"design_id": "<string>", "comment_id": "<string>"}
+                ]
+                ```
+            max_concurrency (integer): Maximum number of requests in flight at once.
+                Defaults to 8.
+
+        Returns:
+            dict[str, Any]: Comments grouped by design ID, plus a list of the requests
+                that failed.
+
+        Tags:
+            comment, batch
+        """
+        for item in comments:
+            if not item.get("design_id") or not item.get("comment_id"):
+                raise ValueError("Each comment requires 'design_id' and 'comment_id'")
+
+        def fetch(item: dict[str, str]) -> dict[str, Any]:
+            return self.v1_designs_designid_comments_commentid(
+                item["design_id"], item["comment_id"]
+            )
+
+        results = await run_batch(comments, fetch, max_concurrency=max_concurrency)
+        by_design: dict[str, list[dict[str, Any]]] = {}
+        errors = []
+        for item, result, error in results:
+            if error is not None:
+                errors.append({**item, "error": error})
+                continue
+            comment = _compact_comment(result.get("comment", result))
+            by_design.setdefault(item["design_id"], []).append(comment)
+        return {
+            "designs": by_design,
+            "fetched": len(results) - len(errors),
+            "errors": errors,
+        }
+
+    async def batch_reply_to_comments(
+        self, replies: list[dict[str, str]], max_concurrency: int = 8
+    ) -> dict[str, Any]:
+        """
+        Posts many comment replies in parallel, retrying rate-limited requests.
+
+        Args:
+            replies (array): Replies to post, each an object with `design_id`,
+                `comment_id` and `message`.
+                Example:
+                ```json
+                [
+                  {
+                    "design_id": "<string>",
+                    "comment_id": "<string>",
+                    "message": "<string>"
+                  }
+                ]
+                ```
+            max_concurrency (integer): Maximum number of requests in flight at once.
+                Defaults to 8.
+
+        Returns:
+            dict[str, Any]: The IDs of the created replies keyed by parent comment ID,
+                plus a list of the replies that failed.
+
+        Tags:
+            comment, batch
+        """
+        for item in replies:
+            if not all(item.get(key) for key in ("design_id", "comment_id", "message")):
+                raise ValueError(
+                    "Each reply requires 'design_id', 'comment_id' and 'message'"
+                )
+
+        def post(item: dict[str, str]) -> dict[str, Any]:
+            return self.v1_comments_commentid_replies(
+                item["comment_id"],
+                attached_to={"design_id": item["design_id"], "type": "design"},
+                message=item["message"],
+            )
+
+        results = await run_batch(replies, post, max_concurrency=max_concurrency)
+        created: dict[str, list[str]] = {}
+        errors = []
+        for item, result, error in results:
+            if error is not None:
+                errors.append(
+                    {
+                        "comment_id": item["comment_id"],
+                        "design_id": item["design_id"],
+                        "error": error,
+                    }
+                )
+                continue
+            reply = result.get("comment", result)
+            created.setdefault(item["comment_id"], []).append(reply.get("id"))
+        return {
+            "replies": created,
+            "posted": len(results) - len(errors),
+            "errors": errors,
+        }
+
+    async def batch_designs_from_images(  # noqa: PLR0913, PLR0917
+        self,
+        files: list[str],
+        design_type: dict[str, Any] | None = None,
+        export_format: dict[str, Any] | None = None,
+        upload_workers: int = 4,
+        create_workers: int = 4,
+        export_workers: int = 4,
+        queue_size: int = 16,
+    ) -> dict[str, Any]:
+        """
+        Turns many local images into designs and exports them, overlapping the
+        upload, create and export steps in a pipeline.
+
+        Args:
+            files (array): Paths of the local image files to upload.
+            design_type (object): Optional design type for the created designs.
+                Example:
+                ```json
+                {"type": "preset", "name": "doc"}
+                ```
+            export_format (object): Export format for every design. Defaults to PDF.
+                Example:
+                ```json
+                {"type": "pdf", "export_quality": "regular"}
+                ```
+            upload_workers (integer): Concurrent uploads. Defaults to 4.
+            create_workers (integer): Concurrent design creations. Defaults to 4.
+            export_workers (integer): Concurrent exports. Defaults to 4.
+            queue_size (integer): Capacity of the queue in front of each stage.
+                Defaults to 16.
+
+        Returns:
+            dict[str, Any]: One result per file with its asset ID, design ID and export
+                URLs, or the failing stage and error, plus per-stage throughput and
+                backpressure statistics.
+
+        Tags:
+            design, export, batch
+        """
+        export_format = export_format or {"type": "pdf"}
+
+        async def upload(path: str) -> dict[str, Any]:
+            job = (await call_with_retry(self._upload_asset_file, path)).get("job", {})
+            if job.get("status") != "success":
+                job = await wait_for_job(self.v1_asset_uploads_jobid, job["id"])
+            return {"file": path, "asset_id": job["asset"]["id"]}
+
+        async def create(item: dict[str, Any]) -> dict[str, Any]:
+            def create_design(asset_id: str) -> dict[str, Any]:
+                return self.v1_designs1(
+                    asset_id=asset_id,
+                    design_type=design_type,
+                    title=Path(item["file"]).stem,
+                )
+
+            created = await call_with_retry(create_design, item["asset_id"])
+            design = created["design"]
+            return {**item, "design_id": design["id"]}
+
+        async def export(item: dict[str, Any]) -> dict[str, Any]:
+            def start_export(design_id: str) -> dict[str, Any]:
+                return self.v1_exports(design_id=design_id, format=export_format)
+
+            started = await call_with_retry(start_export, item["design_id"])
+            job = started.get("job", {})
+            if job.get("status") != "success":
+                job = await wait_for_job(self.v1_exports_exportid, job["id"])
+            return {**item, "urls": job.get("urls", [])}
+
+        records, stats = await run_pipeline(
+            files,
+            [
+                Stage("upload", upload, workers=upload_workers, queue_size=queue_size),
+                Stage("create", create, workers=create_workers, queue_size=queue_size),
+                Stage("export", export, workers=export_workers, queue_size=queue_size),
+            ],
+        )
+        results = []
+        for record in records:
+            if "error" in record:
+                results.append(
+                    {
+                        "file": record["input"],
+                        "stage": record["stage"],
+                        "error": record["error"],
+                    }
+                )
+            else:
+                results.append(record["result"])
+        return {"results": results, "stats": stats}
+
+    async def export_design(
+        self, design_id: str, format: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """
+        Exports a design and waits for the export to finish, reporting its progress.
+
+        Args:
+            design_id (string): ID of the design to export.
+            format (object): Export format. Defaults to PDF.
+                Example:
+                ```json
+                {"type": "png", "pages": [1, 2]}
+                ```
+
+        Returns:
+            dict[str, Any]: The finished export job, including the download URLs.
+
+        Tags:
+            export, important
+        """
+        if not design_id:
+            raise ValueError("Missing required parameter 'design_id'")
+
+        def start_export(design_id: str) -> dict[str, Any]:
+            return self.v1_exports(
+                design_id=design_id, format=format or {"type": "pdf"}
+            )
+
+        job = (await call_with_retry(start_export, design_id))["job"]
+        if job.get("status") != "success":
+            job = await wait_for_job(
+                self.v1_exports_exportid, job["id"], progress_from=0
+            )
+        return {"job": job}
+
+    async def download_export(
+        self,
+        export_id: str,
+        directory: str,
+        max_connections: int = 8,
+        expires_in: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Downloads all files of a finished export concurrently, splitting large files
+        into parallel range requests and verifying their sizes.
+
+        Args:
+            export_id (string): ID of a finished export job.
+            directory (string): Local directory to write the files to. Created if
+                missing.
+            max_connections (integer): Maximum concurrent connections. Defaults to 8.
+            expires_in (number): Seconds until the export URLs expire. Requests that
+                would start later fail fast.
+
+        Returns:
+            dict[str, Any]: One entry per export URL with the local path and size, or
+                the error that stopped it.
+
+        Tags:
+            export
+        """
+        export = await call_with_retry(self.v1_exports_exportid, export_id)
+        job = export.get("job", {})
+        if job.get("status") != "success":
+            raise ValueError(
+                f"Export '{export_id}' has not finished (status: {job.get('status')})"
+            )
+        manager = DownloadManager(max_connections=max_connections)
+        try:
+            files = await manager.download(
+                job.get("urls", []), directory, expires_in=expires_in
+            )
+        finally:
+            manager.close()
+        return {"files": files, "failed": sum(1 for file in files if "error" in file)}
+
+    async def autofill_design(
+        self, brand_template_id: str, data: dict[str, Any], title: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Autofills a brand template into a new design and waits for the job to finish,
+        reporting its progress.
+
+        Args:
+            brand_template_id (string): ID of the brand template to autofill.
+            data (object): Values for the template's data fields.
+                Example:
+                ```json
+                {"headline": {"type": "text", "text": "Summer sale"}}
+                ```
+            title (string): Optional title of the new design.
+
+        Returns:
+            dict[str, Any]: The finished autofill job, including the created design.
+
+        Tags:
+            autofill
+        """
+        if not brand_template_id:
+            raise ValueError("Missing required parameter 'brand_template_id'")
+
+        def start_autofill(brand_template_id: str) -> dict[str, Any]:
+            return self.v1_autofills(
+                brand_template_id=brand_template_id, data=data, title=title
+            )
+
+        job = (await call_with_retry(start_autofill, brand_template_id))["job"]
+        if job.get("status") != "success":
+            job = await wait_for_job(
+                self.v1_autofills_jobid, job["id"], progress_from=0
+            )
+        return {"job": job}
+
+    async def upload_asset_file(self, path: str) -> dict[str, Any]:
+        """
+        Uploads a local file as an asset and waits for processing to finish,
+        reporting the bytes sent and the job's progress.
+
+        Args:
+            path (string): Path of the local file to upload.
+
+        Returns:
+            dict[str, Any]: The finished upload job, including the created asset.
+
+        Tags:
+            asset
+        """
+        started = await call_with_retry(
+            lambda: self._upload_asset_file(path, report=True)
+        )
+        job = started["job"]
+        if job.get("status") != "success":
+            job = await wait_for_job(
+                self.v1_asset_uploads_jobid, job["id"], progress_from=50
+            )
+        return {"job": job}
+
+    async def import_design_file(
+        self, path: str, title: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Imports a local file (such as a PDF or PowerPoint) as a new design and waits
+        for the import to finish, reporting its progress.
+
+        Args:
+            path (string): Path of the local file to import.
+            title (string): Title of the new design. Defaults to the file name.
+
+        Returns:
+            dict[str, Any]: The finished import job, including the created designs.
+
+        Tags:
+            design_import
+        """
+        title = (title or Path(path).stem)[:50]
+        metadata = {"title_base64": base64.b64encode(title.encode()).decode()}
+
+        def start_import() -> dict[str, Any]:
+            return self._upload_file(
+                "/v1/imports", path, "Import-Metadata", metadata, report=True
+            )
+
+        job = (await call_with_retry(start_import))["job"]
+        if job.get("status") != "success":
+            job = await wait_for_job(self.v1_imports_jobid, job["id"], progress_from=50)
+        return {"job": job}
+
+    async def search_brand_templates(
+        self,
+        query: str | None = None,
+        fields: list[str] | None = None,
+        limit: int = 10,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Searches a locally cached catalog of brand templates by fuzzy title match and
+        required dataset field names.
+
+        Args:
+            query (string): Text to match against template titles. Matches tolerate
+                typos and word order.
+            fields (array): Dataset field names every returned template must have,
+                e.g. `["headline", "hero_image"]`.
+            limit (integer): Maximum number of templates to return. Defaults to 10.
+            refresh (boolean): Rebuild the catalog from the API before searching. The
+                catalog otherwise refreshes itself hourly.
+
+        Returns:
+            dict[str, Any]: Matching templates, best first, each with its ID, title,
+                URLs, dataset fields and match score.
+
+        Tags:
+            brand_template, important
+        """
+        if refresh:
+            await self.brand_template_catalog.refresh()
+        templates = await self.brand_template_catalog.search(
+            query=query, fields=fields, limit=limit
+        )
+        return {"templates": templates}
+
+    async def run_workflow(
+        self,
+        steps: list[dict[str, Any]],
+        outputs: list[str] | None = None,
+        max_concurrency: int = 8,
+    ) -> dict[str, Any]:
+        """
+        Runs a multi-step plan of Canva tools server-side, in parallel where possible,
+        and returns only the final results.
+
+        Args:
+            steps (array): Workflow steps. Each step has an `id`, the `tool` to call (a
+                tool name without the app prefix) and its `args`. Arguments can
+                reference earlier results with `${step_id.path.to.value}`. Set `wait`
+                to true to poll a started export, upload, autofill or import job until
+                it finishes.
+                Example:
+                ```json
+                [
+                  {"id": "search", "tool": "v1_designs", "args": {"query": "Q3"}},
+                  {"id": "export", "tool": "v1_exports", "wait": true,
+                   "args": {"design_id": "${search.items.0.id}",
+                            "format": {"type": "pdf"}}}
+                ]
+                ```
+            outputs (array): IDs of the steps whose results are returned. Defaults to
+                the steps no other step depends on.
+            max_concurrency (integer): Maximum number of steps running at once.
+                Defaults to 8.
+
+        Returns:
+            dict[str, Any]: The results of the output steps keyed by step ID, and the
+                errors of any failed or skipped steps.
+
+        Tags:
+            workflow, important
+        """
+        tools = {
+            tool.__name__: tool
+            for tool in self.list_tools()
+            if tool.__name__ != "run_workflow"
+        }
+        job_pollers = {
+            "v1_asset_uploads": self.v1_asset_uploads_jobid,
+            "v1_autofills": self.v1_autofills_jobid,
+            "v1_exports": self.v1_exports_exportid,
+            "v1_imports": self.v1_imports_jobid,
+        }
+        return await workflow.execute(
+            steps, tools, job_pollers, outputs=outputs, max_concurrency=max_concurrency
+        )
+
     def list_tools(self):
         return [
             self.v1_apps_appid_jwks,
@@ -893,5 +1559,52 @@ class CanvaApp(APIApplication):
             self.v1_folders_move,
             self.v1_folders,
             self.v1_users_me,
-            self.v1_users_me_profile
+            self.v1_users_me_profile,
+            self.batch_get_comments,
+            self.batch_reply_to_comments,
+            self.batch_designs_from_images,
+            self.export_design,
+            self.download_export,
+            self.autofill_design,
+            self.upload_asset_file,
+            self.import_design_file,
+            self.search_brand_templates,
+            self.run_workflow,
+        ]
+
+
+def _compact_comment(comment: dict[str, Any]) -> dict[str, Any]:
+    author = comment.get("author") or {}
+    assignee = comment.get("assignee") or {}
+    compact = {
+        "id": comment.get("id"),
+        "thread_id": comment.get("thread_id"),
+        "message": comment.get("message"),
+        "author": author.get("display_name") or author.get("id"),
+        "assignee": assignee.get("display_name") or assignee.get("id"),
+        "created_at": comment.get("created_at"),
+    }
+    return {k: v for k, v in compact.items() if v is not None}
+
+
+def _affected_paths(endpoint: str, body: Any) -> list[str]:
+    """Returns the cached read paths, besides `endpoint`, made stale by `body`."""
+    if not isinstance(body, dict):
+        return []
+    if endpoint == "/v1/folders/move":
+        return [
+            f"/v1/folders/{body[key]}/items"
+            for key in ("from_folder_id", "to_folder_id")
+            if body.get(key)
         ]
+    if endpoint == "/v1/folders" and body.get("parent_folder_id"):
+        return [f"/v1/folders/{body['parent_folder_id']}/items"]
+    attached_to = body.get("attached_to")
+    design_id = attached_to.get("design_id") if isinstance(attached_to, dict) else None
+    if design_id and endpoint.startswith("/v1/comments"):
+        # POST /v1/comments/{commentId}/replies changes the thread read via the design.
+        comment_id = endpoint.removeprefix("/v1/comments").strip("/").partition("/")[0]
+        if comment_id:
+            return [f"/v1/designs/{design_id}/comments/{comment_id}"]
+        return [f"/v1/designs/{design_id}/comments"]
+    return []
@@ -0,0 +1,140 @@
+import asyncio
+import random
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import httpx
+from loguru import logger
+
+from universal_mcp_canva.progress import report_progress
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 3
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+    return min(2**attempt, 30) + random.uniform(0, 0.5)
+
+
+async def call_with_retry(
+    fn: Callable[..., Any], *args: Any, max_retries: int = DEFAULT_MAX_RETRIES
+) -> Any:
+    """
+    Runs a blocking CanvaApp call in a worker thread, retrying when rate limited.
+
+    429 responses are retried after the server's `Retry-After` delay (or an
+    exponential backoff when the header is missing); any other error is raised.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except httpx.HTTPStatusError as e:
+            if (
+                e.response.status_code != httpx.codes.TOO_MANY_REQUESTS
+                or attempt >= max_retries
+            ):
+                raise
+            delay = _retry_delay(e.response, attempt)
+            logger.debug(f"Rate limited by Canva, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+def describe_error(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}: {error.response.text[:200]}"
+    return f"{type(error).__name__}: {error}"
+
+
+async def run_batch(
+    items: Iterable[Any],
+    fn: Callable[[Any], Any],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+) -> list[tuple[Any, Any, str | None]]:
+    """
+    Calls `fn` once per item with at most `max_concurrency` calls in flight.
+
+    Failures do not abort the batch. Each item yields an `(item, result, error)`
+    tuple in input order, where exactly one of `result` and `error` is set.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    items = list(items)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    completed = 0
+
+    async def run_one(item: Any) -> tuple[Any, Any, str | None]:
+        nonlocal completed
+        async with semaphore:
+            try:
+                outcome = (
+                    item,
+                    await call_with_retry(fn, item, max_retries=max_retries),
+                    None,
+                )
+            except Exception as e:
+                outcome = item, None, describe_error(e)
+        completed += 1
+        await report_progress(
+            completed, len(items), f"{completed}/{len(items)} requests done"
+        )
+        return outcome
+
+    return await asyncio.gather(*(run_one(item) for item in items))
+
+
+async def wait_for_job(  # noqa: PLR0913
+    fetch: Callable[[str], dict[str, Any]],
+    job_id: str,
+    *,
+    interval: float = 1.0,
+    max_interval: float = 10.0,
+    timeout: float = 600.0,
+    progress_from: float | None = None,
+) -> dict[str, Any]:
+    """
+    Polls a Canva asynchronous job until it leaves the `in_progress` state.
+
+    Returns the finished `job` object, or raises `RuntimeError` when the job
+    fails and `TimeoutError` when it does not finish within `timeout` seconds.
+
+    Canva does not report how far along a job is, so with `progress_from` set
+    every poll reports a percentage that climbs from `progress_from` towards
+    100 and reaches it when the job succeeds.
+    """
+    started = asyncio.get_running_loop().time()
+    deadline = started + timeout
+    polls = 0
+    while True:
+        job = (await call_with_retry(fetch, job_id)).get("job", {})
+        status = job.get("status")
+        polls += 1
+        if progress_from is not None:
+            elapsed = asyncio.get_running_loop().time() - started
+            if status == "success":
+                await report_progress(
+                    100, 100, f"Job {job_id} finished after {elapsed:.0f}s"
+                )
+            else:
+                percent = progress_from + (99 - progress_from) * (1 - 0.8**polls)
+                await report_progress(
+                    percent, 100, f"Job {job_id} {status} ({elapsed:.0f}s)"
+                )
+        if status == "success":
+            return job
+        if status == "failed":
+            error = job.get("error") or {}
+            reason = error.get("message") or error.get("code") or "unknown error"
+            raise RuntimeError(f"Job {job_id} failed: {reason}")
+        if asyncio.get_running_loop().time() + interval > deadline:
+            raise TimeoutError(f"Job {job_id} did not finish within {timeout:.0f}s")
+        await asyncio.sleep(interval)
+        interval = min(interval * 1.5, max_interval)
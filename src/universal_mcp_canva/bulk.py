@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import importlib
+import inspect
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import httpx
+from loguru import logger
+from universal_mcp.integrations import ApiKeyIntegration
+from universal_mcp.stores import EnvironmentStore
+
+from universal_mcp_canva.app import CanvaApp
+from universal_mcp_canva.batch import call_with_retry, describe_error
+
+DEFAULT_APP_FACTORY = "universal_mcp_canva.bulk:default_app"
+
+_STOP = None
+
+
+def default_app() -> CanvaApp:
+    """Builds a CanvaApp authenticated with `CANVA_API_KEY`, as the server does."""
+    return CanvaApp(
+        integration=ApiKeyIntegration(name="CANVA_API_KEY", store=EnvironmentStore())
+    )
+
+
+def _load_factory(path: str) -> Callable[[], CanvaApp]:
+    module, _, attribute = path.partition(":")
+    if not attribute:
+        raise ValueError(
+            f"App factory '{path}' must look like 'package.module:function'"
+        )
+    return getattr(importlib.import_module(module), attribute)
+
+
+class SharedRateLimit:
+    """
+    Token bucket shared by every worker process, so all shards share one budget.
+
+    When any worker gets a 429, the whole pool pauses for the server's
+    `Retry-After` delay instead of each process discovering the limit on its own.
+
+    Args:
+        context: Multiprocessing context the shared values are created in.
+        rate (float | None): Requests per second across all workers. None only
+            applies 429 pauses.
+        burst (int): Maximum number of requests that can be sent back to back.
+    """
+
+    def __init__(self, context, rate: float | None = None, burst: int = 10) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._lock = context.Lock()
+        self._tokens = context.Value("d", float(burst), lock=False)
+        self._updated = context.Value("d", time.time(), lock=False)
+        self._paused_until = context.Value("d", 0.0, lock=False)
+
+    def acquire(self, request: httpx.Request | None = None) -> None:
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._paused_until.value - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return
+                    elapsed = now - self._updated.value
+                    self._tokens.value = min(
+                        self.burst, self._tokens.value + elapsed * self.rate
+                    )
+                    self._updated.value = now
+                    if self._tokens.value >= 1:
+                        self._tokens.value -= 1
+                        return
+                    wait = (1 - self._tokens.value) / self.rate
+            time.sleep(wait)
+
+    def observe(self, response: httpx.Response) -> None:
+        if response.status_code != httpx.codes.TOO_MANY_REQUESTS:
+            return
+        try:
+            delay = float(response.headers.get("Retry-After", 1))
+        except ValueError:
+            delay = 1.0
+        with self._lock:
+            self._paused_until.value = max(
+                self._paused_until.value, time.time() + delay
+            )
+
+
+def read_manifest(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Yields the jobs of a JSON-lines manifest: an `id`, a `tool` name and `args`."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            if "id" not in job or "tool" not in job:
+                raise ValueError(
+                    f"Manifest line {line_number} needs an 'id' and a 'tool'"
+                )
+            yield job
+
+
+def completed_ids(results_path: str | Path) -> set[str]:
+    """Returns the IDs of jobs that already succeeded according to a results file."""
+    path = Path(results_path)
+    if not path.exists():
+        return set()
+    done = set()
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by an interrupted run; that job is simply run again.
+                continue
+            if result.get("ok"):
+                done.add(result["id"])
+    return done
+
+
+async def _run_worker(
+    app_factory: str, jobs, results, rate_limit: SharedRateLimit, concurrency: int
+) -> None:
+    app = _load_factory(app_factory)()
+    app.client.event_hooks["request"].append(rate_limit.acquire)
+    app.client.event_hooks["response"].append(rate_limit.observe)
+    tools = {tool.__name__: tool for tool in app.list_tools()}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job: dict[str, Any]) -> None:
+        try:
+            tool = tools.get(job["tool"])
+            if tool is None:
+                raise ValueError(f"Unknown tool '{job['tool']}'")
+            args = job.get("args", {})
+            if inspect.iscoroutinefunction(tool):
+                result = await tool(**args)
+            else:
+                result = await call_with_retry(lambda: tool(**args))
+            results.put({"id": job["id"], "ok": True, "result": result})
+        except Exception as e:
+            results.put({"id": job["id"], "ok": False, "error": describe_error(e)})
+        finally:
+            semaphore.release()
+
+    tasks = set()
+    while True:
+        await semaphore.acquire()
+        job = await asyncio.to_thread(jobs.get)
+        if job is _STOP:
+            break
+        task = asyncio.create_task(run(job))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+
+def _worker(
+    app_factory: str, jobs, results, rate_limit: SharedRateLimit, concurrency: int
+) -> None:
+    asyncio.run(_run_worker(app_factory, jobs, results, rate_limit, concurrency))
+
+
+def run_bulk(  # noqa: PLR0913
+    manifest: str | Path,
+    results_path: str | Path,
+    *,
+    workers: int | None = None,
+    concurrency: int = 16,
+    rate: float | None = None,
+    app_factory: str = DEFAULT_APP_FACTORY,
+) -> dict[str, Any]:
+    """
+    Runs every job of a manifest across a pool of worker processes.
+
+    Each worker process builds its own CanvaApp from `app_factory` and runs up
+    to `concurrency` jobs at once on its own event loop. The parent streams jobs
+    to the workers, enforces the shared request budget, and appends each
+    result to `results_path` as it arrives. That file is the checkpoint:
+    jobs already recorded as successful are skipped when the run is restarted.
+    Returns counts of skipped, submitted, succeeded and failed jobs.
+    """
+    workers = workers or os.cpu_count() or 1
+    done = completed_ids(results_path)
+    pending = [job for job in read_manifest(manifest) if job["id"] not in done]
+    summary = {
+        "skipped": len(done),
+        "submitted": len(pending),
+        "succeeded": 0,
+        "failed": 0,
+    }
+    if not pending:
+        return {**summary, "elapsed_seconds": 0.0}
+
+    context = multiprocessing.get_context("spawn")
+    jobs = context.Queue(maxsize=workers * concurrency * 2)
+    results = context.Queue()
+    rate_limit = SharedRateLimit(context, rate=rate)
+    processes = [
+        context.Process(
+            target=_worker,
+            args=(app_factory, jobs, results, rate_limit, concurrency),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def feed() -> None:
+        for job in pending:
+            jobs.put(job)
+        for _ in processes:
+            jobs.put(_STOP)
+
+    threading.Thread(target=feed, daemon=True).start()
+    started = time.monotonic()
+    received = 0
+    with open(results_path, "a", encoding="utf-8") as out:
+        while received < len(pending):
+            try:
+                result = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    logger.error(
+                        f"All bulk workers exited with {len(pending) - received} "
+                        "jobs unfinished"
+                    )
+                    break
+                continue
+            received += 1
+            summary["succeeded" if result["ok"] else "failed"] += 1
+            out.write(json.dumps(result, separators=(",", ":")) + "\n")
+            # Jobs have side effects, so each result must be durable before the next
+            # one is accepted; otherwise a crash would re-run finished autofills and
+            # exports on resume.
+            out.flush()
+            os.fsync(out.fileno())
+            if received % 100 == 0 or received == len(pending):
+                logger.info(f"Bulk run: {received}/{len(pending)} jobs finished")
+
+    for process in processes:
+        process.join(timeout=10)
+    elapsed = time.monotonic() - started
+    summary["unfinished"] = len(pending) - received
+    summary["elapsed_seconds"] = round(elapsed, 3)
+    summary["jobs_per_second"] = round(received / elapsed, 3) if elapsed else 0.0
+    return summary
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a manifest of Canva tool calls across a process pool."
+    )
+    parser.add_argument(
+        "manifest", help="JSON-lines file with one {id, tool, args} job per line"
+    )
+    parser.add_argument(
+        "results",
+        help="JSON-lines file results are appended to; also the resume checkpoint",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent jobs per worker"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="Requests per second across all workers",
+    )
+    parser.add_argument(
+        "--app-factory",
+        default=DEFAULT_APP_FACTORY,
+        help="'module:function' returning a CanvaApp",
+    )
+    args = parser.parse_args(argv)
+    summary = run_bulk(
+        args.manifest,
+        args.results,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        app_factory=args.app_factory,
+    )
+    print(json.dumps(summary))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
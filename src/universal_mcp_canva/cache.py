@@ -0,0 +1,103 @@
+import threading
+import time
+from typing import Any
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+
+class ResponseCache:
+    """
+    In-memory cache of successful GET responses, keyed by request path and query.
+
+    Entries live until they expire or are invalidated, by a write through the
+    same client or a webhook notification (see `universal_mcp_canva.webhooks`).
+    Canva does not notify about designs being edited, created or deleted, and
+    design reads carry signed thumbnail URLs that expire, so the default TTL is
+    kept short; use `ttl=None` only for data nothing else changes.
+
+    Args:
+        ttl (float | None): Seconds an entry stays valid. Defaults to 5 minutes.
+            None keeps entries until they are explicitly invalidated.
+        max_entries (int): Upper bound on cached responses; the oldest entry
+            is evicted first once the bound is reached.
+    """
+
+    def __init__(self, ttl: float | None = 300.0, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, httpx.Response]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(url: str, params: dict[str, Any] | None = None) -> str:
+        path = urlsplit(url).path
+        query = {k: v for k, v in (params or {}).items() if v is not None}
+        if not query:
+            return path
+        return f"{path}?{urlencode(sorted(query.items()), doseq=True)}"
+
+    def get(
+        self, url: str, params: dict[str, Any] | None = None
+    ) -> httpx.Response | None:
+        key = self.key(url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, response = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return response
+
+    def set(
+        self, url: str, params: dict[str, Any] | None, response: httpx.Response
+    ) -> None:
+        key = self.key(url, params)
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self.max_entries:
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic(), response)
+
+    def invalidate(self, path: str, prefix: bool = False) -> int:
+        """
+        Drops cached responses for a path and returns how many were removed.
+
+        With `prefix=False` only the exact path (with any query string) is
+        dropped; with `prefix=True` every path below it is dropped as well.
+        """
+        path = urlsplit(path).path.rstrip("/")
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if key.split("?", 1)[0] == path
+                or (prefix and key.startswith(path + "/"))
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,335 @@
+import base64
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Literal
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+DEFAULT_REDACTED_HEADERS = frozenset(
+    {"authorization", "cookie", "set-cookie", "proxy-authorization"}
+)
+
+# Query parameters that carry the signature or credentials of pre-signed export,
+# download and thumbnail URLs (S3 and CloudFront style) or OAuth flows.
+DEFAULT_REDACTED_PARAMS = frozenset(
+    {
+        "x-amz-signature",
+        "x-amz-credential",
+        "x-amz-security-token",
+        "signature",
+        "policy",
+        "key-pair-id",
+        "sig",
+        "token",
+        "access_token",
+        "code",
+        "client_secret",
+    }
+)
+
+_URL = re.compile(r"https?://[^\s\"'<>\\]+")
+
+# Bodies are stored decoded, so headers describing the wire encoding no longer apply.
+_DROPPED_HEADERS = frozenset(
+    {"content-encoding", "content-length", "transfer-encoding"}
+)
+
+
+class CassetteMiss(httpx.TransportError):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+
+def _read_lines(path: Path) -> list[str]:
+    if path.suffix != ".gz":
+        return path.read_text(encoding="utf-8").splitlines()
+    lines = []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            lines.extend(f)
+        except EOFError:
+            # The recorder was killed mid-write; the interaction it was writing is lost.
+            pass
+    return lines
+
+
+def _encode_line(path: Path, line: str) -> bytes:
+    data = line.encode("utf-8")
+    # Each line is a complete gzip member, so the file stays readable even if
+    # the recording process exits without closing the transport.
+    return gzip.compress(data) if path.suffix == ".gz" else data
+
+
+def _redact_url(url: str, redact_params: frozenset[str]) -> str:
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(name.lower() in redact_params for name, _ in query):
+        return url
+    query = [
+        (name, "REDACTED" if name.lower() in redact_params else value)
+        for name, value in query
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query, safe="/:")))
+
+
+def _redact_urls(text: str, redact_params: frozenset[str]) -> str:
+    return _URL.sub(lambda match: _redact_url(match.group(0), redact_params), text)
+
+
+def _request_key(
+    method: str,
+    url: httpx.URL | str,
+    redact_params: frozenset[str] = DEFAULT_REDACTED_PARAMS,
+) -> str:
+    # Recorded URLs have their signatures redacted, so live URLs are keyed the same way.
+    url = httpx.URL(_redact_url(str(url), redact_params))
+    query = "&".join(sorted(url.query.decode().split("&"))) if url.query else ""
+    return f"{method.upper()} {url.path}?{query}"
+
+
+def _body_digest(request: httpx.Request) -> str | None:
+    try:
+        content = request.content
+    except httpx.RequestNotRead:
+        # Streamed uploads are not buffered just to fingerprint them.
+        return None
+    return hashlib.sha256(content).hexdigest()[:16] if content else None
+
+
+class Cassette:
+    """
+    Recorded Canva HTTP interactions stored as JSON lines.
+
+    The file is gzip-compressed when its path ends in `.gz`.
+
+    Each line holds one request/response pair: the method, URL, a digest of the
+    request body, the response status, headers and body, and the original
+    latency. Request bodies themselves and credential headers are never written,
+    and signed query parameters are redacted from URLs, including URLs that
+    appear in response bodies and headers.
+
+    Pass `cassette.recorder()` or `cassette.player()` as the `transport` of a
+    `CanvaApp` to record real traffic or replay it offline.
+
+    Args:
+        path (str | Path): Location of the cassette file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def load(self) -> list[dict[str, Any]]:
+        interactions = []
+        for line in _read_lines(self.path):
+            if not line.strip():
+                continue
+            try:
+                interactions.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Only the last line can be cut short by an interrupted recording.
+                break
+        return interactions
+
+    def recorder(
+        self,
+        transport: httpx.BaseTransport | None = None,
+        redact_headers: frozenset[str] = DEFAULT_REDACTED_HEADERS,
+        redact_params: frozenset[str] = DEFAULT_REDACTED_PARAMS,
+    ) -> "RecordingTransport":
+        return RecordingTransport(
+            self.path,
+            transport=transport,
+            redact_headers=redact_headers,
+            redact_params=redact_params,
+        )
+
+    def player(
+        self,
+        timing: Literal["fast", "original"] = "fast",
+        speed: float = 1.0,
+        loop: bool = True,
+        redact_params: frozenset[str] = DEFAULT_REDACTED_PARAMS,
+    ) -> "ReplayTransport":
+        return ReplayTransport(
+            self.load(),
+            timing=timing,
+            speed=speed,
+            loop=loop,
+            redact_params=redact_params,
+        )
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """
+    Forwards requests to a real transport and appends each interaction to a cassette.
+
+    Args:
+        path (str | Path): Cassette file to append to.
+        transport (httpx.BaseTransport | None): Transport doing the real I/O.
+            Defaults to `httpx.HTTPTransport()`.
+        redact_headers (frozenset[str]): Lower-cased header names replaced by
+            `REDACTED`.
+        redact_params (frozenset[str]): Lower-cased query parameter names whose
+            values are replaced by `REDACTED` in every recorded URL.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        transport: httpx.BaseTransport | None = None,
+        redact_headers: frozenset[str] = DEFAULT_REDACTED_HEADERS,
+        redact_params: frozenset[str] = DEFAULT_REDACTED_PARAMS,
+    ) -> None:
+        self.transport = transport or httpx.HTTPTransport()
+        self.redact_headers = redact_headers
+        self.redact_params = redact_params
+        self.path = Path(path)
+        self._file = self.path.open("ab")
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def _headers(self, headers: httpx.Headers) -> dict[str, str]:
+        return {
+            name: "REDACTED"
+            if name in self.redact_headers
+            else _redact_urls(value, self.redact_params)
+            for name, value in headers.items()
+            if name not in _DROPPED_HEADERS
+        }
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = self.transport.handle_request(request)
+        try:
+            content = response.read()
+        finally:
+            response.close()
+        elapsed = time.monotonic() - started
+
+        try:
+            body, encoding = (
+                _redact_urls(content.decode("utf-8"), self.redact_params),
+                "utf-8",
+            )
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode(), "base64"
+        interaction = {
+            "method": request.method,
+            "url": _redact_url(str(request.url), self.redact_params),
+            "request_headers": self._headers(request.headers),
+            "request_digest": _body_digest(request),
+            "status": response.status_code,
+            "headers": self._headers(response.headers),
+            "body": body,
+            "encoding": encoding,
+            "elapsed": round(elapsed, 4),
+            "recorded_at": time.time(),
+        }
+        with self._lock:
+            self._file.write(
+                _encode_line(
+                    self.path, json.dumps(interaction, separators=(",", ":")) + "\n"
+                )
+            )
+            self._file.flush()
+            self.recorded += 1
+        headers = [
+            (k, v) for k, v in response.headers.items() if k not in _DROPPED_HEADERS
+        ]
+        return httpx.Response(
+            response.status_code, headers=headers, content=content, request=request
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+        self.transport.close()
+
+
+class ReplayTransport(httpx.BaseTransport):
+    """
+    Serves recorded interactions instead of calling Canva.
+
+    Requests are matched on method, path and query, preferring an interaction
+    whose request body digest also matches. Repeated requests get the recorded
+    responses in order and, with `loop`, start again from the first one.
+
+    Args:
+        interactions (list): Interactions as returned by `Cassette.load`.
+        timing (str): `fast` answers immediately; `original` waits for the recorded
+            latency.
+        speed (float): Divides the recorded latency when replaying with original timing.
+        loop (bool): Reuse recordings once they have all been served.
+        redact_params (frozenset[str]): Query parameters redacted at recording time,
+            ignored when matching.
+    """
+
+    def __init__(
+        self,
+        interactions: list[dict[str, Any]],
+        timing: Literal["fast", "original"] = "fast",
+        speed: float = 1.0,
+        loop: bool = True,
+        redact_params: frozenset[str] = DEFAULT_REDACTED_PARAMS,
+    ) -> None:
+        if timing not in ("fast", "original"):
+            raise ValueError("timing must be 'fast' or 'original'")
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.timing = timing
+        self.speed = speed
+        self.loop = loop
+        self.redact_params = redact_params
+        self._lock = threading.Lock()
+        self._recorded: dict[str, list[dict[str, Any]]] = {}
+        for interaction in interactions:
+            key = _request_key(interaction["method"], interaction["url"], redact_params)
+            self._recorded.setdefault(key, []).append(interaction)
+        self._pending = {key: deque(items) for key, items in self._recorded.items()}
+        self.served = 0
+        self.misses = 0
+
+    def _next(self, request: httpx.Request) -> dict[str, Any] | None:
+        key = _request_key(request.method, request.url, self.redact_params)
+        with self._lock:
+            pending = self._pending.get(key)
+            if not pending and self.loop and key in self._recorded:
+                pending = self._pending[key] = deque(self._recorded[key])
+            if not pending:
+                self.misses += 1
+                return None
+            digest = _body_digest(request)
+            match = next(
+                (i for i in pending if i.get("request_digest") == digest), pending[0]
+            )
+            pending.remove(match)
+            self.served += 1
+            return match
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        interaction = self._next(request)
+        if interaction is None:
+            raise CassetteMiss(
+                f"No recorded response for {request.method} {request.url}",
+                request=request,
+            )
+        if self.timing == "original":
+            time.sleep(interaction.get("elapsed", 0.0) / self.speed)
+        if interaction.get("encoding") == "base64":
+            content = base64.b64decode(interaction["body"])
+        else:
+            content = interaction["body"].encode("utf-8")
+        return httpx.Response(
+            interaction["status"],
+            headers=interaction["headers"],
+            content=content,
+            request=request,
+        )
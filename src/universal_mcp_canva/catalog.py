@@ -0,0 +1,227 @@
+import asyncio
+import json
+import re
+import time
+from difflib import SequenceMatcher, get_close_matches
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+from loguru import logger
+
+from universal_mcp_canva.batch import call_with_retry, run_batch
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def _title_score(
+    query: str, query_tokens: list[str], title: str, title_tokens: list[str]
+) -> float:
+    title = title.lower()
+    if query in title:
+        return 1.0
+    matched = sum(
+        1
+        for token in query_tokens
+        if get_close_matches(token, title_tokens, n=1, cutoff=0.8)
+    )
+    token_score = matched / len(query_tokens) if query_tokens else 0.0
+    return max(token_score, SequenceMatcher(None, query, title).ratio())
+
+
+class BrandTemplateCatalog:
+    """
+    Local catalog of all brand templates with their dataset fields precomputed.
+
+    A refresh pages through `v1_brand_templates` once and fetches the dataset
+    of every new or updated template concurrently. Searches are then answered
+    from memory: required field names are looked up in an inverted index and
+    titles are matched fuzzily, so picking a template costs no API calls.
+
+    The catalog refreshes itself on access once it is older than
+    `refresh_interval`, and is persisted to `path` when one is given.
+
+    Args:
+        app (CanvaApp): Application used to list templates and fetch datasets.
+        refresh_interval (float): Seconds after which the catalog is considered stale.
+        path (str | Path | None): Optional JSON file the catalog is loaded from and
+            saved to.
+        max_concurrency (int): Maximum concurrent dataset requests during a refresh.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        refresh_interval: float = 3600.0,
+        path: str | Path | None = None,
+        max_concurrency: int = 8,
+    ) -> None:
+        self.app = app
+        self.refresh_interval = refresh_interval
+        self.path = Path(path) if path else None
+        self.max_concurrency = max_concurrency
+        self.refreshed_at: float | None = None
+        self._templates: dict[str, dict[str, Any]] = {}
+        self._by_field: dict[str, set[str]] = {}
+        self._lock: asyncio.Lock | None = None
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        data = json.loads(self.path.read_text())
+        self.refreshed_at = data.get("refreshed_at")
+        self._templates = {
+            template["id"]: template for template in data.get("templates", [])
+        }
+        self._reindex()
+
+    def _save(self) -> None:
+        data = {
+            "refreshed_at": self.refreshed_at,
+            "templates": list(self._templates.values()),
+        }
+        self.path.write_text(json.dumps(data))
+
+    def _reindex(self) -> None:
+        by_field: dict[str, set[str]] = {}
+        for template_id, template in self._templates.items():
+            for field in template.get("fields", {}):
+                by_field.setdefault(field.lower(), set()).add(template_id)
+        self._by_field = by_field
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.refreshed_at is None
+            or time.time() - self.refreshed_at > self.refresh_interval
+        )
+
+    async def _list_templates(self) -> list[dict[str, Any]]:
+        items, continuation = [], None
+        while True:
+            page = await call_with_retry(
+                lambda: self.app.v1_brand_templates(continuation=continuation)
+            )
+            items.extend(page.get("items", []))
+            continuation = page.get("continuation")
+            if not continuation:
+                return items
+
+    async def refresh(self) -> dict[str, int]:
+        """
+        Re-lists all brand templates and fetches datasets for new or updated ones.
+
+        Returns counts of templates listed, datasets fetched and datasets that failed.
+        """
+        async with self._refresh_lock():
+            return await self._refresh()
+
+    def _refresh_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _refresh(self) -> dict[str, int]:
+        cache = getattr(self.app, "cache", None)
+        if cache is not None:
+            # Listings and datasets must come from Canva, not from earlier cached reads.
+            cache.invalidate(
+                f"{urlsplit(self.app.base_url).path}/v1/brand-templates", prefix=True
+            )
+        listed = await self._list_templates()
+        changed = [
+            item
+            for item in listed
+            if item["id"] not in self._templates
+            or self._templates[item["id"]].get("updated_at") != item.get("updated_at")
+        ]
+        results = await run_batch(
+            [item["id"] for item in changed],
+            self.app.v1_brand_templates_brandtemplateid_dataset,
+            max_concurrency=self.max_concurrency,
+        )
+        datasets = {
+            template_id: result
+            for template_id, result, error in results
+            if error is None
+        }
+        failed = len(results) - len(datasets)
+
+        templates = {}
+        for item in listed:
+            updated_at = item.get("updated_at")
+            if item["id"] in datasets:
+                dataset = datasets[item["id"]].get("dataset") or {}
+                fields = {name: spec.get("type") for name, spec in dataset.items()}
+            elif item["id"] in self._templates:
+                previous = self._templates[item["id"]]
+                fields = previous.get("fields", {})
+                # Keeping the old timestamp when the dataset fetch failed makes the
+                # next refresh retry it.
+                updated_at = previous.get("updated_at")
+            else:
+                continue
+            templates[item["id"]] = {
+                "id": item["id"],
+                "title": item.get("title", ""),
+                "updated_at": updated_at,
+                "view_url": item.get("view_url"),
+                "create_url": item.get("create_url"),
+                "fields": fields,
+            }
+        self._templates = templates
+        self._reindex()
+        self.refreshed_at = time.time()
+        if self.path:
+            self._save()
+        logger.debug(
+            f"Refreshed brand template catalog: {len(templates)} templates, "
+            f"{len(datasets)} datasets fetched"
+        )
+        return {
+            "templates": len(listed),
+            "datasets_fetched": len(datasets),
+            "datasets_failed": failed,
+        }
+
+    async def search(
+        self,
+        query: str | None = None,
+        fields: list[str] | None = None,
+        limit: int = 10,
+        min_score: float = 0.5,
+    ) -> list[dict[str, Any]]:
+        """
+        Finds templates whose title fuzzily matches `query` and that have `fields`.
+
+        Refreshes the catalog first if it is stale.
+        """
+        if self.stale:
+            async with self._refresh_lock():
+                # Concurrent searches wait here for one refresh instead of each running
+                # their own.
+                if self.stale:
+                    await self._refresh()
+        candidates = set(self._templates)
+        for field in fields or []:
+            candidates &= self._by_field.get(field.lower(), set())
+
+        matches = []
+        query = (query or "").strip().lower()
+        query_tokens = _tokens(query)
+        for template_id in candidates:
+            template = self._templates[template_id]
+            score = 1.0
+            if query:
+                score = _title_score(
+                    query, query_tokens, template["title"], _tokens(template["title"])
+                )
+                if score < min_score:
+                    continue
+            matches.append({**template, "score": round(score, 3)})
+        matches.sort(key=lambda match: (-match["score"], match["title"]))
+        return matches[:limit]
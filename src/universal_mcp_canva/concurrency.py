@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from typing import Any
+
+import httpx
+from loguru import logger
+
+
+class _FamilyState:
+    def __init__(self, initial_limit: float, window: int) -> None:
+        self.limit = initial_limit
+        self.in_flight = 0
+        self.window = window
+        self.latencies: dict[str, deque[float]] = {}
+        self.last_decrease = 0.0
+        self.increases = 0
+        self.decreases = 0
+        self.throttled = 0
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter for Canva requests, tuned separately per endpoint family.
+
+    Each family starts at `initial_limit` requests in flight. Every successful
+    request that completes while the family is using its whole limit raises the
+    limit by `1 / limit`, about one extra slot per round trip's worth of
+    requests. A 429 cuts the limit by `throttle_ratio`, and a latency above
+    `latency_tolerance` times the family's recent minimum (or a timeout) cuts
+    it by `latency_ratio`. Decreases happen at most once per observed
+    latency, so one burst of slow responses counts as a single signal.
+
+    Baselines are kept per route within a family, so a slow upload is compared
+    with earlier uploads rather than with the fast status polls of the same family.
+
+    Args:
+        initial_limit (int): Starting number of concurrent requests per family.
+        min_limit (int): Lowest limit a family can be cut to.
+        max_limit (int): Highest limit a family can grow to.
+        latency_tolerance (float): Latency inflation over the baseline treated as
+            congestion.
+        throttle_ratio (float): Multiplier applied to the limit on a 429.
+        latency_ratio (float): Multiplier applied to the limit on latency inflation or
+            timeouts.
+        window (int): Number of recent latencies per route the baseline is taken from.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        throttle_ratio: float = 0.5,
+        latency_ratio: float = 0.9,
+        window: int = 100,
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit"
+            )
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.throttle_ratio = throttle_ratio
+        self.latency_ratio = latency_ratio
+        self.window = window
+        self._condition = threading.Condition()
+        self._families: dict[str, _FamilyState] = {}
+
+    def _state(self, family: str) -> _FamilyState:
+        state = self._families.get(family)
+        if state is None:
+            state = self._families[family] = _FamilyState(
+                float(self.initial_limit), self.window
+            )
+        return state
+
+    def acquire(self, family: str) -> None:
+        with self._condition:
+            state = self._state(family)
+            while state.in_flight >= int(state.limit):
+                self._condition.wait()
+            state.in_flight += 1
+
+    def try_acquire(self, family: str) -> bool:
+        """Takes a slot of `family` only if one is free right now."""
+        with self._condition:
+            state = self._state(family)
+            if state.in_flight >= int(state.limit):
+                return False
+            state.in_flight += 1
+            return True
+
+    def release(
+        self,
+        family: str,
+        latency: float,
+        throttled: bool = False,
+        timed_out: bool = False,
+        route: str = "",
+    ) -> None:
+        with self._condition:
+            state = self._state(family)
+            saturated = state.in_flight >= int(state.limit)
+            state.in_flight -= 1
+            latencies = state.latencies.setdefault(route, deque(maxlen=state.window))
+            baseline = min(latencies) if latencies else None
+            congested = timed_out or (
+                baseline is not None and latency > baseline * self.latency_tolerance
+            )
+            if throttled:
+                state.throttled += 1
+                self._decrease(
+                    family, state, self.throttle_ratio, latency, "rate limited"
+                )
+            elif congested:
+                self._decrease(
+                    family, state, self.latency_ratio, latency, "latency inflation"
+                )
+            elif saturated and state.limit < self.max_limit:
+                state.limit = min(state.limit + 1 / state.limit, float(self.max_limit))
+                state.increases += 1
+            if not throttled and not timed_out:
+                latencies.append(latency)
+            self._condition.notify_all()
+
+    def _decrease(
+        self,
+        family: str,
+        state: _FamilyState,
+        ratio: float,
+        latency: float,
+        reason: str,
+    ) -> None:
+        now = time.monotonic()
+        if now - state.last_decrease < latency:
+            return
+        state.limit = max(state.limit * ratio, float(self.min_limit))
+        state.last_decrease = now
+        state.decreases += 1
+        logger.debug(f"Reduced '{family}' concurrency to {state.limit:.1f} ({reason})")
+
+    def slot(self, family: str, route: str = "") -> AbstractContextManager[None]:
+        """
+        Holds a slot of `family` while the request runs and feeds its outcome back.
+
+        `route` identifies the kind of request (e.g. method and URL template)
+        whose latency baseline the request is compared with.
+        """
+        self.acquire(family)
+        return self._held(family, route)
+
+    def try_slot(
+        self, family: str, route: str = ""
+    ) -> AbstractContextManager[None] | None:
+        """Like `slot`, but returns None instead of waiting when no slot is free."""
+        return self._held(family, route) if self.try_acquire(family) else None
+
+    @contextmanager
+    def _held(self, family: str, route: str) -> Iterator[None]:
+        started = time.monotonic()
+        throttled = timed_out = False
+        try:
+            yield
+        except httpx.HTTPStatusError as e:
+            throttled = e.response.status_code == httpx.codes.TOO_MANY_REQUESTS
+            raise
+        except httpx.TimeoutException:
+            timed_out = True
+            raise
+        finally:
+            self.release(
+                family,
+                time.monotonic() - started,
+                throttled=throttled,
+                timed_out=timed_out,
+                route=route,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                family: {
+                    "limit": round(state.limit, 2),
+                    "in_flight": state.in_flight,
+                    "baseline_latency_seconds": {
+                        route: round(min(latencies), 4)
+                        for route, latencies in state.latencies.items()
+                        if latencies
+                    },
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                    "throttled": state.throttled,
+                }
+                for family, state in self._families.items()
+            }
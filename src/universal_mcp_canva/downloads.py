@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+import httpx
+from loguru import logger
+
+from universal_mcp_canva.batch import describe_error
+from universal_mcp_canva.progress import format_bytes, report_progress_threadsafe
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+_MD5_ETAG = re.compile(r'^"?([0-9a-f]{32})"?$')
+
+
+class _File:
+    def __init__(self, url: str, path: Path) -> None:
+        self.url = url
+        self.path = path
+        self.size: int | None = None
+        self.etag: str | None = None
+        self.ranges: list[tuple[int, int] | None] = []
+        self.retries = 0
+        self.error: str | None = None
+
+
+class DownloadManager:
+    """
+    Downloads export files concurrently, splitting large files into range requests.
+
+    Every file is probed with a one-byte range request to learn its size and
+    whether the server supports ranges. Files at or above `range_threshold`
+    are pre-allocated on disk and fetched as `range_size` pieces over parallel
+    connections, each written straight to its offset. A piece that fails or
+    comes back short is retried on its own, and every file is checked against
+    its expected size (and MD5 ETag, when the server provides one).
+
+    Export URLs are pre-signed, so the manager uses its own client without the
+    Canva credentials.
+
+    Args:
+        max_connections (int): Maximum concurrent connections across all files.
+        range_size (int): Size in bytes of each range request.
+        range_threshold (int): Files at least this large are split into ranges.
+        max_retries (int): Attempts per range after the first one fails.
+        timeout (httpx.Timeout | float): Timeout for each request.
+        transport (httpx.BaseTransport | None): Optional transport, e.g. for testing.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        max_connections: int = 8,
+        range_size: int = 8 * 1024 * 1024,
+        range_threshold: int = 16 * 1024 * 1024,
+        max_retries: int = 3,
+        timeout: httpx.Timeout | float = httpx.Timeout(60.0, connect=10.0),
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        if max_connections < 1 or range_size < 1:
+            raise ValueError("max_connections and range_size must be positive")
+        self.max_connections = max_connections
+        self.range_size = range_size
+        self.range_threshold = range_threshold
+        self.max_retries = max_retries
+        self.client = httpx.Client(
+            timeout=timeout,
+            follow_redirects=True,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._lock = threading.Lock()
+        self._received = 0
+        self._reported = 0
+        self._total = 0
+
+    def _probe(self, file: _File) -> None:
+        with self.client.stream(
+            "GET", file.url, headers={"Range": "bytes=0-0"}
+        ) as response:
+            response.raise_for_status()
+            file.etag = response.headers.get("ETag")
+            match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+            if (
+                response.status_code == httpx.codes.PARTIAL_CONTENT
+                and match
+                and match.group(3) != "*"
+            ):
+                file.size = int(match.group(3))
+            elif "Content-Length" in response.headers:
+                file.size = int(response.headers["Content-Length"])
+                return
+        if file.size is not None and file.size >= self.range_threshold:
+            file.ranges = [
+                (start, min(start + self.range_size, file.size) - 1)
+                for start in range(0, file.size, self.range_size)
+            ]
+
+    def _count(self, received: int) -> None:
+        with self._lock:
+            self._received += received
+            if self._received <= self._reported:
+                # Bytes of a failed range are fetched again; progress only moves on.
+                return
+            self._reported = done = self._received
+            total = self._total
+        report_progress_threadsafe(
+            done,
+            total or None,
+            f"Downloaded {format_bytes(done)} of {format_bytes(total)}",
+        )
+
+    def _fetch(
+        self, file: _File, byte_range: tuple[int, int] | None, deadline: float | None
+    ) -> None:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("Download did not finish before the export URLs expired")
+        headers = {}
+        offset, expected = 0, file.size
+        if byte_range is not None:
+            offset, end = byte_range
+            expected = end - offset + 1
+            headers["Range"] = f"bytes={offset}-{end}"
+        written = 0
+        try:
+            with self.client.stream("GET", file.url, headers=headers) as response:
+                response.raise_for_status()
+                if byte_range is not None:
+                    match = _CONTENT_RANGE.match(
+                        response.headers.get("Content-Range", "")
+                    )
+                    if (
+                        response.status_code != httpx.codes.PARTIAL_CONTENT
+                        or not match
+                        or int(match.group(1)) != offset
+                    ):
+                        raise OSError(
+                            "Server ignored range request for bytes "
+                            f"{offset}-{byte_range[1]}"
+                        )
+                with file.path.open("r+b" if byte_range is not None else "wb") as f:
+                    f.seek(offset)
+                    for chunk in response.iter_bytes():
+                        f.write(chunk)
+                        written += len(chunk)
+                        self._count(len(chunk))
+            if expected is not None and written != expected:
+                raise OSError(
+                    f"Expected {expected} bytes at offset {offset}, received {written}"
+                )
+        except BaseException:
+            self._count(-written)
+            raise
+
+    async def _fetch_with_retry(
+        self,
+        file: _File,
+        byte_range: tuple[int, int] | None,
+        semaphore: asyncio.Semaphore,
+        deadline: float | None,
+    ) -> None:
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(
+                        self._fetch, file, byte_range, deadline
+                    )
+                except TimeoutError:
+                    raise
+                except (httpx.HTTPError, OSError) as e:
+                    if attempt == self.max_retries:
+                        raise
+                    file.retries += 1
+                    logger.debug(
+                        f"Retrying {byte_range or 'download'} of {file.path.name}: {e}"
+                    )
+            await asyncio.sleep(min(2**attempt, 10))
+
+    def _verify(self, file: _File) -> bool:
+        actual = file.path.stat().st_size
+        if file.size is not None and actual != file.size:
+            raise OSError(f"{file.path.name} is {actual} bytes, expected {file.size}")
+        match = _MD5_ETAG.match(file.etag or "")
+        if match is None:
+            return False
+        digest = hashlib.md5()
+        with file.path.open("rb") as f:
+            while chunk := f.read(1024 * 1024):
+                digest.update(chunk)
+        if digest.hexdigest() != match.group(1):
+            raise OSError(f"{file.path.name} does not match its ETag checksum")
+        return True
+
+    async def download(
+        self, urls: list[str], directory: str | Path, expires_in: float | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Downloads every URL into `directory` and returns one result per URL.
+
+        `expires_in` is the number of seconds the URLs stay valid; requests that
+        would start after that fail fast instead of hitting expired links.
+        """
+        deadline = time.monotonic() + expires_in if expires_in is not None else None
+        self._received = self._reported = 0
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        names: set[str] = set()
+        for index, url in enumerate(urls):
+            # Decode before taking the last segment, so encoded separators cannot
+            # escape `directory`.
+            name = Path(unquote(urlsplit(url).path).replace("\\", "/")).name
+            if name in ("", ".", ".."):
+                name = f"export-{index + 1}"
+            if name in names:
+                name = f"{index + 1}-{name}"
+            names.add(name)
+            files.append(_File(url, directory / name))
+
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def probe(file: _File) -> None:
+            async with semaphore:
+                await asyncio.to_thread(self._probe, file)
+
+        probes = await asyncio.gather(
+            *(probe(file) for file in files), return_exceptions=True
+        )
+        for file, outcome in zip(files, probes, strict=True):
+            if isinstance(outcome, Exception):
+                file.error = describe_error(outcome)
+            elif file.ranges:
+                with file.path.open("wb") as f:
+                    f.truncate(file.size)
+            else:
+                file.ranges = [None]
+        self._total = sum(file.size or 0 for file in files if file.error is None)
+
+        async def fetch_file(file: _File) -> None:
+            if file.error is not None:
+                return
+            pieces = [
+                self._fetch_with_retry(file, piece, semaphore, deadline)
+                for piece in file.ranges
+            ]
+            outcomes = await asyncio.gather(*pieces, return_exceptions=True)
+            failures = [
+                outcome for outcome in outcomes if isinstance(outcome, BaseException)
+            ]
+            if failures:
+                file.error = describe_error(failures[0])
+
+        await asyncio.gather(*(fetch_file(file) for file in files))
+
+        results = []
+        for file in files:
+            result: dict[str, Any] = {"url": file.url, "path": str(file.path)}
+            if file.error is None:
+                try:
+                    result["checksum_verified"] = await asyncio.to_thread(
+                        self._verify, file
+                    )
+                except OSError as e:
+                    file.error = str(e)
+            if file.error is not None:
+                result["error"] = file.error
+            else:
+                result["size"] = file.path.stat().st_size
+            result["ranges"] = len(file.ranges)
+            result["retries"] = file.retries
+            results.append(result)
+        return results
+
+    def close(self) -> None:
+        self.client.close()
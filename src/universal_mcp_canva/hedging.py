@@ -0,0 +1,209 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager
+from typing import Any
+
+from loguru import logger
+
+
+class HedgePolicy:
+    """
+    Hedged requests for idempotent GETs.
+
+    A request that has not answered after the recent p95 latency of its
+    endpoint family gets a second, identical request; whichever returns first
+    wins and the other is discarded. Until a family has `min_samples`
+    latencies recorded, `initial_delay` is used instead of the percentile.
+
+    Requests only go to the pool when a worker is free, so the hedge delay is
+    measured from when the request is actually sent, never from a queue. When
+    the pool is full the request simply runs on the caller's thread without a
+    hedge, and each family sends at most `max_hedge_ratio` extra requests per
+    request, so a slow Canva is not hit with double the load.
+
+    Args:
+        percentile (float): Latency percentile after which a hedge fires.
+            Defaults to 0.95.
+        initial_delay (float): Hedge delay in seconds before enough samples exist.
+        min_delay (float): Lower bound on the hedge delay, so fast calls are not
+            hedged.
+        min_samples (int): Samples needed before the percentile is trusted.
+        window (int): Number of recent latencies kept per endpoint family.
+        max_workers (int): Size of the thread pool running hedgeable and hedge
+            requests.
+        max_hedge_ratio (float): Maximum hedges per request of a family, between 0
+            and 1.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        percentile: float = 0.95,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = 16,
+        max_hedge_ratio: float = 0.1,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError("max_hedge_ratio must be between 0 and 1")
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+        self.max_hedge_ratio = max_hedge_ratio
+        self._busy = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="canva-hedge"
+        )
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def record(self, family: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(family, deque(maxlen=self.window)).append(
+                seconds
+            )
+
+    def delay(self, family: str) -> float:
+        with self._lock:
+            samples = sorted(self._latencies.get(family, ()))
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        index = min(int(len(samples) * self.percentile), len(samples) - 1)
+        return max(samples[index], self.min_delay)
+
+    def _counters_for(self, family: str) -> dict[str, int]:
+        return self._counters.setdefault(
+            family, {"requests": 0, "hedged": 0, "hedge_wins": 0, "hedges_skipped": 0}
+        )
+
+    def _count(self, family: str, key: str) -> None:
+        with self._lock:
+            self._counters_for(family)[key] += 1
+
+    def _reserve_worker(self) -> bool:
+        with self._lock:
+            if self._busy >= self.max_workers:
+                return False
+            self._busy += 1
+            return True
+
+    def _reserve_hedge(self, family: str) -> bool:
+        with self._lock:
+            counters = self._counters_for(family)
+            if (
+                self._busy >= self.max_workers
+                or counters["hedged"] >= self.max_hedge_ratio * counters["requests"]
+            ):
+                counters["hedges_skipped"] += 1
+                return False
+            self._busy += 1
+            counters["hedged"] += 1
+            return True
+
+    def _cancel_hedge(self, family: str) -> None:
+        with self._lock:
+            counters = self._counters_for(family)
+            self._busy -= 1
+            counters["hedged"] -= 1
+            counters["hedges_skipped"] += 1
+
+    def _submit(
+        self, family: str, fn: Callable[[], Any], started: threading.Event
+    ) -> Future:
+        def attempt() -> Any:
+            started.set()
+            try:
+                return self._timed(family, fn)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+        # Each attempt runs in a copy of the caller's context, so tracing and
+        # progress reporting follow it.
+        return self._executor.submit(contextvars.copy_context().run, attempt)
+
+    def _timed(self, family: str, fn: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        result = fn()
+        self.record(family, time.monotonic() - started)
+        return result
+
+    def run(
+        self,
+        family: str,
+        fn: Callable[[], Any],
+        hedge_slot: Callable[[], AbstractContextManager | None] | None = None,
+    ) -> Any:
+        """
+        Runs `fn`, hedging it with a second call if it outlasts the hedge delay.
+
+        `fn` is timed from when it starts, so callers should wait for any
+        concurrency limit before calling `run`. `hedge_slot`, when given, is
+        called before a hedge is sent and must return a context manager that
+        holds a slot for it, or None when no slot is free right away, in which
+        case the hedge is skipped.
+        """
+        self._count(family, "requests")
+        if not self._reserve_worker():
+            self._count(family, "hedges_skipped")
+            return self._timed(family, fn)
+        started = threading.Event()
+        primary = self._submit(family, fn, started)
+        # A worker was free, so this only waits for it to pick the request up.
+        started.wait()
+        done, _ = wait([primary], timeout=self.delay(family))
+        if done or not self._reserve_hedge(family):
+            return primary.result()
+
+        slot = hedge_slot() if hedge_slot is not None else None
+        if hedge_slot is not None and slot is None:
+            self._cancel_hedge(family)
+            return primary.result()
+
+        def hedged() -> Any:
+            if slot is None:
+                return fn()
+            with slot:
+                return fn()
+
+        logger.debug(f"Hedging slow '{family}' request")
+        hedge = self._submit(family, hedged, threading.Event())
+        pending: set[Future] = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count(family, "hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            families = {
+                family: dict(counters) for family, counters in self._counters.items()
+            }
+        for family, counters in families.items():
+            counters["hedge_rate"] = (
+                round(counters["hedged"] / counters["requests"], 4)
+                if counters["requests"]
+                else 0.0
+            )
+            counters["hedge_delay_seconds"] = round(self.delay(family), 4)
+        return families
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
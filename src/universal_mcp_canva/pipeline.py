@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+from universal_mcp_canva.batch import describe_error
+from universal_mcp_canva.progress import report_progress
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a pipeline, run by its own pool of workers fed from a bounded queue.
+
+    Args:
+        name (str): Name used in results and statistics.
+        fn (Callable): Coroutine function turning the previous stage's output into
+            this stage's output.
+        workers (int): Number of items processed concurrently by this stage.
+        queue_size (int): Capacity of the queue feeding this stage. When it is full,
+            the upstream stage blocks, which is reported as backpressure.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Awaitable[Any]],
+        workers: int = 4,
+        queue_size: int = 16,
+    ) -> None:
+        if workers < 1 or queue_size < 1:
+            raise ValueError(
+                f"Stage '{name}' needs at least one worker and a queue of at least 1"
+            )
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.queue_size = queue_size
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def stats(self, elapsed: float) -> dict[str, Any]:
+        elapsed = max(elapsed, 1e-9)
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "throughput_per_second": round(self.processed / elapsed, 3),
+            "utilization": round(self.busy_seconds / (self.workers * elapsed), 3),
+            "backpressure_seconds": round(self.blocked_seconds, 3),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+async def run_pipeline(
+    items: Iterable[Any], stages: list[Stage]
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Streams items through the stages so that every stage works concurrently.
+
+    An item that fails in one stage skips the remaining stages. Returns one
+    record per input, in input order, holding either the final `result` or the
+    `stage` and `error` that stopped it, together with per-stage statistics.
+    """
+    if not stages:
+        raise ValueError("A pipeline needs at least one stage")
+    items = list(items)
+    queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in stages]
+    records: list[dict[str, Any]] = []
+    started = time.monotonic()
+    finished = 0
+
+    async def finish() -> None:
+        nonlocal finished
+        finished += 1
+        await report_progress(
+            finished, len(items), f"{finished}/{len(items)} items through the pipeline"
+        )
+
+    async def feed() -> None:
+        for item in items:
+            record = {"input": item}
+            records.append(record)
+            await _put(queues[0], stages[0], record)
+
+    async def work(index: int) -> None:
+        stage = stages[index]
+        value_key = "input" if index == 0 else "result"
+        while True:
+            record = await queues[index].get()
+            if record is _DONE:
+                return
+            if await _process(stage, record, value_key) and index + 1 < len(stages):
+                await _put(queues[index + 1], stages[index + 1], record)
+            else:
+                await finish()
+
+    upstream = asyncio.create_task(feed())
+    workers = [
+        [asyncio.create_task(work(i)) for _ in range(stage.workers)]
+        for i, stage in enumerate(stages)
+    ]
+    try:
+        await upstream
+        for index, stage in enumerate(stages):
+            for _ in range(stage.workers):
+                await queues[index].put(_DONE)
+            await asyncio.gather(*workers[index])
+    finally:
+        for task in (upstream, *(task for tasks in workers for task in tasks)):
+            task.cancel()
+
+    elapsed = time.monotonic() - started
+    stats = {
+        "elapsed_seconds": round(elapsed, 3),
+        "stages": {stage.name: stage.stats(elapsed) for stage in stages},
+    }
+    return records, stats
+
+
+async def _put(queue: asyncio.Queue, stage: Stage, record: dict[str, Any]) -> None:
+    if queue.full():
+        blocked_at = time.monotonic()
+        await queue.put(record)
+        stage.blocked_seconds += time.monotonic() - blocked_at
+    else:
+        queue.put_nowait(record)
+    stage.max_queue_depth = max(stage.max_queue_depth, queue.qsize())
+
+
+async def _process(stage: Stage, record: dict[str, Any], value_key: str) -> bool:
+    """Runs one stage on a record and returns whether it succeeded."""
+    began = time.monotonic()
+    try:
+        record["result"] = await stage.fn(record[value_key])
+    except Exception as e:
+        stage.failed += 1
+        record["stage"] = stage.name
+        record["error"] = describe_error(e)
+        record.pop("result", None)
+        return False
+    finally:
+        stage.busy_seconds += time.monotonic() - began
+    stage.processed += 1
+    return True
@@ -0,0 +1,88 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from loguru import logger
+
+_KIB = 1024
+
+ProgressCallback = Callable[[float, float | None, str | None], Awaitable[None]]
+
+_reporter: ContextVar[tuple[asyncio.AbstractEventLoop, ProgressCallback] | None] = (
+    ContextVar("canva_progress_reporter", default=None)
+)
+
+
+@contextmanager
+def progress_reporter(callback: ProgressCallback) -> Iterator[None]:
+    """
+    Routes progress reported by Canva tools in the current context to `callback`.
+
+    The MCP server installs the request's `report_progress` here, so long-running
+    tools can emit progress notifications instead of leaving clients to poll.
+    Must be entered from the event loop that `callback` belongs to.
+    """
+    token = _reporter.set((asyncio.get_running_loop(), callback))
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+@contextmanager
+def progress_suppressed() -> Iterator[None]:
+    """Silences progress reports, e.g. from a tool run as one step of a larger one."""
+    token = _reporter.set(None)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+async def _send(
+    callback: ProgressCallback,
+    progress: float,
+    total: float | None,
+    message: str | None,
+) -> None:
+    try:
+        await callback(progress, total, message)
+    except Exception as e:
+        logger.debug(f"Failed to send progress notification: {e}")
+
+
+async def report_progress(
+    progress: float, total: float | None = None, message: str | None = None
+) -> None:
+    """Reports progress to the current reporter, if any. Failures are only logged."""
+    reporter = _reporter.get()
+    if reporter is not None:
+        await _send(reporter[1], progress, total, message)
+
+
+def report_progress_threadsafe(
+    progress: float, total: float | None = None, message: str | None = None
+) -> None:
+    """
+    Schedules a progress report from a worker thread without waiting for it.
+
+    Blocking HTTP calls run through `asyncio.to_thread`, which carries the
+    reporter over from the calling coroutine's context.
+    """
+    reporter = _reporter.get()
+    if reporter is None:
+        return
+    loop, callback = reporter
+    if not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(
+            _send(callback, progress, total, message), loop
+        )
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < _KIB or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= _KIB
+    return f"{size:.1f} GiB"
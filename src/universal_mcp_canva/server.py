@@ -1,19 +1,33 @@
-
-from universal_mcp.servers import SingleMCPServer
 from universal_mcp.integrations import ApiKeyIntegration
+from universal_mcp.servers import SingleMCPServer
 from universal_mcp.stores import EnvironmentStore
 
 from universal_mcp_canva.app import CanvaApp
+from universal_mcp_canva.progress import progress_reporter
+
+
+class CanvaMCPServer(SingleMCPServer):
+    """SingleMCPServer that forwards progress from long-running tools to MCP clients."""
+
+    async def call_tool(self, name, arguments):
+        context = self.get_context()
+        try:
+            meta = context.request_context.meta
+        except ValueError:
+            meta = None
+        if meta is None or meta.progressToken is None:
+            return await super().call_tool(name, arguments)
+        with progress_reporter(context.report_progress):
+            return await super().call_tool(name, arguments)
+
 
 env_store = EnvironmentStore()
 integration_instance = ApiKeyIntegration(name="CANVA_API_KEY", store=env_store)
 app_instance = CanvaApp(integration=integration_instance)
 
-mcp = SingleMCPServer(
+mcp = CanvaMCPServer(
     app_instance=app_instance,
 )
 
 if __name__ == "__main__":
     mcp.run()
-
-
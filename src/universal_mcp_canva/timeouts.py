@@ -0,0 +1,58 @@
+from urllib.parse import urlsplit
+
+import httpx
+
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# Uploads and imports stream whole files, so they get a longer read/write budget.
+DEFAULT_FAMILY_TIMEOUTS = {
+    "asset-uploads": httpx.Timeout(300.0, connect=10.0),
+    "imports": httpx.Timeout(300.0, connect=10.0),
+}
+
+
+def endpoint_family(url: str | httpx.URL) -> str:
+    """
+    Returns the endpoint family of a Canva API URL.
+
+    For example, `/rest/v1/designs/{designId}` belongs to the `designs` family.
+
+    URLs outside the versioned API (such as export download links) map to `other`.
+    """
+    segments = [segment for segment in urlsplit(str(url)).path.split("/") if segment]
+    for position, segment in enumerate(segments[:-1]):
+        if segment == "v1":
+            return segments[position + 1]
+    return "other"
+
+
+class EndpointTimeouts:
+    """
+    Per-endpoint-family connect/read/write/pool timeouts for the Canva HTTP client.
+
+    The timeouts are applied from an httpx request hook, so they cover every
+    request made through `CanvaApp.client`, including direct uploads.
+
+    Args:
+        default (httpx.Timeout | float): Timeout for families without an override.
+        overrides (dict | None): Timeouts keyed by endpoint family (see
+            `endpoint_family`). Plain numbers are used for every phase of the
+            request. Merged over `DEFAULT_FAMILY_TIMEOUTS`.
+    """
+
+    def __init__(
+        self,
+        default: httpx.Timeout | float = DEFAULT_TIMEOUT,
+        overrides: dict[str, httpx.Timeout | float] | None = None,
+    ) -> None:
+        self.default = httpx.Timeout(default)
+        merged = {**DEFAULT_FAMILY_TIMEOUTS, **(overrides or {})}
+        self.overrides = {
+            family: httpx.Timeout(timeout) for family, timeout in merged.items()
+        }
+
+    def for_url(self, url: str | httpx.URL) -> httpx.Timeout:
+        return self.overrides.get(endpoint_family(url), self.default)
+
+    def apply(self, request: httpx.Request) -> None:
+        request.extensions["timeout"] = self.for_url(request.url).as_dict()
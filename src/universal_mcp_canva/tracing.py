@@ -0,0 +1,239 @@
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+PHASES = ("queue", "connect", "tls", "ttfb", "download", "decode")
+
+# Path segments that name resources rather than identify them; anything else is masked.
+_ROUTE_WORDS = frozenset(
+    {
+        "v1",
+        "apps",
+        "jwks",
+        "assets",
+        "upload",
+        "asset-uploads",
+        "autofills",
+        "brand-templates",
+        "dataset",
+        "comments",
+        "replies",
+        "designs",
+        "connect",
+        "keys",
+        "imports",
+        "exports",
+        "folders",
+        "items",
+        "move",
+        "users",
+        "me",
+        "profile",
+    }
+)
+
+_current: ContextVar["_Span | None"] = ContextVar("canva_trace_span", default=None)
+
+
+def route_template(url: str) -> str:
+    """Returns the API route of a URL with IDs masked, e.g. `/v1/designs/{id}`."""
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    if "v1" in segments:
+        segments = segments[segments.index("v1") :]
+    return "/" + "/".join(
+        segment if segment in _ROUTE_WORDS else "{id}" for segment in segments
+    )
+
+
+class _Span:
+    def __init__(
+        self, tracer: "Tracer", method: str, url: str, params: dict[str, Any] | None
+    ) -> None:
+        self.tracer = tracer
+        self.started = time.monotonic()
+        self.events: dict[str, float] = {}
+        self.record: dict[str, Any] = {
+            "method": method,
+            "route": route_template(url),
+            "params": sorted(k for k, v in (params or {}).items() if v is not None),
+        }
+        self.attached = False
+        self.recorded = False
+        self.decoded = False
+
+    def on_event(self, name: str, info: dict[str, Any]) -> None:
+        # httpcore prefixes events with their layer, e.g. "connection." or "http11.".
+        self.events.setdefault(name.partition(".")[2], time.monotonic())
+
+    def _between(self, start: str, end: str) -> float | None:
+        if start in self.events and end in self.events:
+            return self.events[end] - self.events[start]
+        return None
+
+    def close(self, status: int | None, error: BaseException | None) -> None:
+        ended = time.monotonic()
+        sent = self.events.get("connect_tcp.started") or self.events.get(
+            "send_request_headers.started"
+        )
+        phases = {
+            "queue": sent - self.started if sent else None,
+            "connect": self._between("connect_tcp.started", "connect_tcp.complete"),
+            "tls": self._between("start_tls.started", "start_tls.complete"),
+            "ttfb": self._between(
+                "send_request_headers.started", "receive_response_headers.complete"
+            ),
+            "download": self._between(
+                "receive_response_body.started", "receive_response_body.complete"
+            ),
+            "decode": None,
+        }
+        self.record.update(
+            status=status,
+            error=type(error).__name__ if error else None,
+            phases={
+                phase: round(seconds, 6)
+                for phase, seconds in phases.items()
+                if seconds is not None
+            },
+            total=round(ended - self.started, 6),
+        )
+
+    def add_decode(self, seconds: float) -> None:
+        if self.decoded:
+            return
+        self.decoded = True
+        self.tracer._add_decode(self, seconds)
+
+
+class _TracedResponse(httpx.Response):
+    """Response whose first `json()` call is timed as the decode phase of its span."""
+
+    _canva_span: _Span
+
+    def json(self, **kwargs: Any) -> Any:
+        span = self.__dict__.get("_canva_span")
+        if span is None or span.decoded:
+            return super().json(**kwargs)
+        started = time.monotonic()
+        value = super().json(**kwargs)
+        span.add_decode(time.monotonic() - started)
+        return value
+
+
+class Tracer:
+    """
+    Opt-in request tracing that splits Canva calls into phases and keeps the slowest.
+
+    Each sampled call records the time spent waiting before its request went out
+    (our own concurrency limits and the connection pool), TCP connect (including
+    DNS), TLS handshake, time to first byte, body download and JSON decoding.
+    Only the HTTP method, a route with IDs masked and the names (never the
+    values) of the parameters are kept.
+
+    Args:
+        sample_rate (float): Fraction of calls to trace, between 0 and 1.
+        slowest (int): Number of slowest calls kept for `report`.
+        slow_threshold (float | None): Calls slower than this many seconds are logged
+            as they finish.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        slowest: int = 20,
+        slow_threshold: float | None = 5.0,
+    ) -> None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.sample_rate = sample_rate
+        self.slowest = slowest
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._slowest: list[dict[str, Any]] = []
+        self._traced = 0
+        self._phase_totals = dict.fromkeys(PHASES, 0.0)
+
+    @contextmanager
+    def span(
+        self, method: str, url: str, params: dict[str, Any] | None = None
+    ) -> Iterator[_Span | None]:
+        if random.random() >= self.sample_rate:
+            yield None
+            return
+        span = _Span(self, method, url, params)
+        token = _current.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            if error is not None or not span.attached:
+                response = getattr(error, "response", None)
+                span.close(
+                    response.status_code if response is not None else None, error
+                )
+            # Recorded now, whether or not the body is ever decoded; `json()` adds
+            # its time later.
+            self._finish(span)
+
+    def attach(self, span: _Span | None, response: httpx.Response) -> httpx.Response:
+        """Records the response status and times its JSON decoding within the span."""
+        if span is None or span.recorded:
+            return response
+        span.close(response.status_code, None)
+        span.attached = True
+        # Timing `json()` needs a hook on this particular response object.
+        response.__class__ = _TracedResponse
+        response._canva_span = span
+        return response
+
+    @staticmethod
+    def request_hook(request: httpx.Request) -> None:
+        span = _current.get()
+        if span is not None:
+            request.extensions["trace"] = span.on_event
+
+    def _add_decode(self, span: _Span, seconds: float) -> None:
+        with self._lock:
+            span.record["phases"]["decode"] = round(seconds, 6)
+            span.record["total"] = round(span.record["total"] + seconds, 6)
+            if span.recorded:
+                self._phase_totals["decode"] += seconds
+
+    def _finish(self, span: _Span) -> None:
+        record = span.record
+        with self._lock:
+            span.recorded = True
+            self._traced += 1
+            for phase, seconds in record["phases"].items():
+                self._phase_totals[phase] += seconds
+            self._slowest.append(record)
+            if len(self._slowest) > self.slowest:
+                self._slowest.remove(min(self._slowest, key=lambda item: item["total"]))
+        if self.slow_threshold is not None and record["total"] > self.slow_threshold:
+            logger.warning(
+                f"Slow Canva call {record['method']} {record['route']}: {record}"
+            )
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            traced = self._traced
+            slowest = sorted(
+                self._slowest, key=lambda item: item["total"], reverse=True
+            )
+            averages = {
+                phase: round(total / traced, 6) if traced else 0.0
+                for phase, total in self._phase_totals.items()
+            }
+        return {"traced": traced, "average_phase_seconds": averages, "slowest": slowest}
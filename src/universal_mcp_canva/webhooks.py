@@ -0,0 +1,266 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from universal_mcp_canva.app import CanvaApp
+from universal_mcp_canva.cache import ResponseCache
+
+# Number of recent notification IDs remembered to skip duplicate deliveries.
+_SEEN_NOTIFICATIONS = 10000
+
+# Notifications are a single signed JWT, so anything larger than this is not from Canva.
+DEFAULT_MAX_BODY_SIZE = 64 * 1024
+
+
+class WebhookVerificationError(Exception):
+    """Raised when a webhook notification cannot be verified with the Connect keys."""
+
+
+class WebhookKeysUnavailableError(Exception):
+    """Raised when the Connect keys needed to verify a notification cannot be loaded."""
+
+
+class WebhookReceiver:
+    """
+    Receives Canva webhook notifications and keeps the local response cache fresh.
+
+    Canva delivers each notification as a signed JWT. The receiver verifies it
+    with the public keys returned by `v1_connect_keys`, then invalidates the
+    cached designs, comments and folder listings the event touches. Canva only
+    notifies about events such as comments, mentions, shares and access
+    requests, not about designs being edited, created or deleted, so the
+    cache's TTL still bounds how stale other reads can get.
+
+    The receiver is also a minimal ASGI application, so it can be mounted
+    directly on the webhook URL configured in the Canva developer portal.
+    Requests are verified off the event loop, and keys are re-fetched for an
+    unknown key ID at most once per `key_refresh_interval`, so unauthenticated
+    requests cannot stall the server or spend the Canva rate limit. Bodies
+    larger than `max_body_size` are refused with 413, and notifications that
+    arrive while the keys cannot be loaded get a 503 so Canva retries them.
+
+    Args:
+        app (CanvaApp): Application used to fetch the Connect keys.
+        cache (ResponseCache | None): Cache to invalidate. Defaults to `app.cache`.
+        on_event (Callable | None): Optional callback invoked with every verified
+            notification after the cache has been updated.
+        key_refresh_interval (float): Minimum seconds between two fetches of the
+            Connect keys.
+        max_body_size (int): Largest request body, in bytes, the ASGI endpoint accepts.
+    """
+
+    def __init__(
+        self,
+        app: CanvaApp,
+        cache: ResponseCache | None = None,
+        on_event: Callable[[dict[str, Any]], None] | None = None,
+        key_refresh_interval: float = 60.0,
+        max_body_size: int = DEFAULT_MAX_BODY_SIZE,
+    ) -> None:
+        self.app = app
+        self.cache = cache if cache is not None else app.cache
+        self.on_event = on_event
+        self.key_refresh_interval = key_refresh_interval
+        self.max_body_size = max_body_size
+        self._keys: dict[str, Any] = {}
+        self._keys_loaded_at: float | None = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._seen: dict[str, None] = {}
+        self.received = 0
+        self.rejected = 0
+
+    def _load_keys(self, kid: str | None) -> None:
+        with self._refresh_lock:
+            # Another thread may have refreshed the keys while this one waited.
+            if kid in self._keys:
+                return
+            loaded_at = self._keys_loaded_at
+            if (
+                loaded_at is not None
+                and time.monotonic() - loaded_at < self.key_refresh_interval
+            ):
+                return
+            self._keys_loaded_at = time.monotonic()
+            jwt = _import_jwt()
+            keys = {}
+            try:
+                for key in self.app.v1_connect_keys().get("keys", []):
+                    keys[key["kid"]] = jwt.PyJWK(key).key
+            except (
+                httpx.HTTPError,
+                jwt.PyJWTError,
+                KeyError,
+                TypeError,
+                ValueError,
+            ) as e:
+                raise WebhookKeysUnavailableError(
+                    f"Could not load the Canva Connect keys: {e}"
+                ) from e
+            with self._lock:
+                self._keys = keys
+        logger.debug(f"Loaded {len(keys)} Canva Connect keys")
+
+    def verify(self, token: str | bytes) -> dict[str, Any]:
+        """
+        Verifies a notification JWT and returns its decoded payload.
+
+        Keys are fetched lazily and refreshed when the token references an
+        unknown key ID, which covers Canva rotating its signing keys. Refreshes
+        happen at most once per `key_refresh_interval`.
+        """
+        jwt = _import_jwt()
+        if isinstance(token, bytes):
+            token = token.decode()
+        token = token.strip()
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jwt.PyJWTError as e:
+            raise WebhookVerificationError(f"Malformed notification: {e}") from e
+        if kid not in self._keys:
+            self._load_keys(kid)
+        key = self._keys.get(kid)
+        if key is None:
+            raise WebhookVerificationError(f"Unknown signing key '{kid}'")
+        try:
+            return jwt.decode(token, key=key, algorithms=["RS256"])
+        except jwt.PyJWTError as e:
+            raise WebhookVerificationError(
+                f"Invalid notification signature: {e}"
+            ) from e
+
+    def apply(self, notification: dict[str, Any]) -> dict[str, Any]:
+        """
+        Invalidates the cache entries affected by a verified notification.
+
+        Returns a summary with the design and folder IDs touched and the number
+        of cache entries dropped.
+        """
+        design_ids: set[str] = set()
+        folder_ids: set[str] = set()
+        _collect_ids(notification.get("content", {}), design_ids, folder_ids)
+
+        dropped = 0
+        if self.cache is not None:
+            base_path = urlsplit(self.app.base_url).path
+            for design_id in design_ids:
+                dropped += self.cache.invalidate(
+                    f"{base_path}/v1/designs/{design_id}", prefix=True
+                )
+            if design_ids:
+                dropped += self.cache.invalidate(f"{base_path}/v1/designs")
+            for folder_id in folder_ids:
+                dropped += self.cache.invalidate(
+                    f"{base_path}/v1/folders/{folder_id}", prefix=True
+                )
+        return {
+            "id": notification.get("id"),
+            "type": notification.get("type")
+            or notification.get("content", {}).get("type"),
+            "design_ids": sorted(design_ids),
+            "folder_ids": sorted(folder_ids),
+            "invalidated": dropped,
+        }
+
+    def handle(self, body: str | bytes) -> dict[str, Any]:
+        """
+        Verifies and applies a raw webhook request body.
+
+        Duplicate deliveries of the same notification ID are acknowledged but
+        not applied twice.
+        """
+        try:
+            notification = self.verify(body)
+        except WebhookVerificationError:
+            self.rejected += 1
+            raise
+        self.received += 1
+        notification_id = notification.get("id")
+        if notification_id is not None:
+            with self._lock:
+                if notification_id in self._seen:
+                    return {"id": notification_id, "duplicate": True}
+                self._seen[notification_id] = None
+                if len(self._seen) > _SEEN_NOTIFICATIONS:
+                    del self._seen[next(iter(self._seen))]
+        summary = self.apply(notification)
+        logger.debug(f"Applied Canva webhook notification: {summary}")
+        if self.on_event is not None:
+            self.on_event(notification)
+        return summary
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return
+        if scope["method"] != "POST":
+            await _respond(send, 405, {"error": "Method not allowed"})
+            return
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            await _respond(send, 413, {"error": "Request body too large"})
+            return
+        body = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > self.max_body_size:
+                await _respond(send, 413, {"error": "Request body too large"})
+                return
+            more_body = message.get("more_body", False)
+        try:
+            summary = await asyncio.to_thread(self.handle, bytes(body))
+        except WebhookVerificationError as e:
+            await _respond(send, 401, {"error": str(e)})
+            return
+        except WebhookKeysUnavailableError as e:
+            logger.warning(str(e))
+            await _respond(
+                send, 503, {"error": "Signing keys unavailable, retry later"}
+            )
+            return
+        await _respond(send, 200, summary)
+
+
+def _import_jwt():
+    try:
+        import jwt  # noqa: PLC0415 - optional dependency, only needed to verify webhooks
+    except ImportError as e:
+        raise ImportError(
+            "Webhook verification requires PyJWT. "
+            "Install it with: pip install 'universal-mcp-canva[webhooks]'"
+        ) from e
+    return jwt
+
+
+def _collect_ids(value: Any, design_ids: set[str], folder_ids: set[str]) -> None:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "design" and isinstance(item, dict) and item.get("id"):
+                design_ids.add(item["id"])
+            elif key == "folder" and isinstance(item, dict) and item.get("id"):
+                folder_ids.add(item["id"])
+            _collect_ids(item, design_ids, folder_ids)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_ids(item, design_ids, folder_ids)
+
+
+async def _respond(send, status: int, payload: dict[str, Any]) -> None:
+    body = json.dumps(payload).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,192 @@
+import asyncio
+import inspect
+import re
+from collections.abc import Callable
+from typing import Any
+
+from universal_mcp_canva.batch import call_with_retry, describe_error, wait_for_job
+from universal_mcp_canva.progress import progress_suppressed, report_progress
+
+_REFERENCE = re.compile(r"\$\{([A-Za-z0-9_\-]+)((?:\.[A-Za-z0-9_\-]+)*)\}")
+
+
+def _references(value: Any) -> set[str]:
+    if isinstance(value, str):
+        return {match.group(1) for match in _REFERENCE.finditer(value)}
+    if isinstance(value, dict):
+        return (
+            set().union(*(_references(item) for item in value.values()))
+            if value
+            else set()
+        )
+    if isinstance(value, list):
+        return set().union(*(_references(item) for item in value)) if value else set()
+    return set()
+
+
+def _lookup(results: dict[str, Any], step_id: str, path: str) -> Any:
+    value = results[step_id]
+    for segment in path.split(".")[1:]:
+        if isinstance(value, list):
+            value = value[int(segment)]
+        elif isinstance(value, dict):
+            value = value[segment]
+        else:
+            raise KeyError(segment)
+    return value
+
+
+def _resolve(value: Any, results: dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        match = _REFERENCE.fullmatch(value)
+        if match:
+            return _lookup(results, match.group(1), match.group(2))
+        return _REFERENCE.sub(
+            lambda m: str(_lookup(results, m.group(1), m.group(2))), value
+        )
+    if isinstance(value, dict):
+        return {key: _resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, results) for item in value]
+    return value
+
+
+def validate(
+    steps: list[dict[str, Any]], tools: dict[str, Callable]
+) -> dict[str, set[str]]:
+    """
+    Checks a workflow and returns the dependencies of every step.
+
+    Raises:
+        ValueError: If a step is malformed, uses an unknown tool, references an
+            unknown step, or the steps form a cycle.
+    """
+    dependencies: dict[str, set[str]] = {}
+    for step in steps:
+        step_id = step.get("id")
+        if not step_id or not isinstance(step_id, str):
+            raise ValueError("Every workflow step needs a string 'id'")
+        if step_id in dependencies:
+            raise ValueError(f"Duplicate workflow step id '{step_id}'")
+        if step.get("tool") not in tools:
+            raise ValueError(f"Step '{step_id}' uses unknown tool '{step.get('tool')}'")
+        depends_on = step.get("depends_on", [])
+        if not isinstance(depends_on, list) or not all(
+            isinstance(needed, str) for needed in depends_on
+        ):
+            raise ValueError(
+                f"Step '{step_id}' needs 'depends_on' as a list of strings"
+            )
+        dependencies[step_id] = _references(step.get("args", {})) | set(depends_on)
+
+    for step_id, needs in dependencies.items():
+        unknown = needs - dependencies.keys()
+        if unknown:
+            raise ValueError(
+                f"Step '{step_id}' references unknown steps: "
+                f"{', '.join(sorted(unknown))}"
+            )
+
+    visiting: set[str] = set()
+    done: set[str] = set()
+
+    def visit(step_id: str) -> None:
+        if step_id in done:
+            return
+        if step_id in visiting:
+            raise ValueError(f"Workflow steps form a cycle through '{step_id}'")
+        visiting.add(step_id)
+        for needed in dependencies[step_id]:
+            visit(needed)
+        visiting.discard(step_id)
+        done.add(step_id)
+
+    for step_id in dependencies:
+        visit(step_id)
+    return dependencies
+
+
+async def execute(
+    steps: list[dict[str, Any]],
+    tools: dict[str, Callable],
+    job_pollers: dict[str, Callable[[str], dict[str, Any]]],
+    outputs: list[str] | None = None,
+    max_concurrency: int = 8,
+) -> dict[str, Any]:
+    """
+    Runs workflow steps as soon as the steps they reference have finished.
+
+    Step arguments may reference earlier results with `${step_id.path.to.value}`;
+    a reference spanning the whole string keeps the referenced value's type.
+    Steps with `"wait": true` that start an asynchronous job are polled until
+    the job finishes. A failed step skips every step that depends on it.
+
+    Returns the results of the `outputs` steps (by default, the steps nothing
+    else depends on) and the errors of failed or skipped steps.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    dependencies = validate(steps, tools)
+    if outputs:
+        unknown = set(outputs) - dependencies.keys()
+        if unknown:
+            raise ValueError(f"Unknown output steps: {', '.join(sorted(unknown))}")
+    else:
+        needed = set().union(*dependencies.values()) if dependencies else set()
+        outputs = [step["id"] for step in steps if step["id"] not in needed]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    finished = {step["id"]: asyncio.Event() for step in steps}
+    results: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    completed = 0
+
+    async def run(step: dict[str, Any]) -> None:
+        nonlocal completed
+        step_id = step["id"]
+        try:
+            for needed in dependencies[step_id]:
+                await finished[needed].wait()
+            failed = sorted(
+                needed for needed in dependencies[step_id] if needed in errors
+            )
+            if failed:
+                errors[step_id] = f"Skipped because {', '.join(failed)} failed"
+                return
+            async with semaphore:
+                try:
+                    args = _resolve(step.get("args", {}), results)
+                    tool = tools[step["tool"]]
+                    if inspect.iscoroutinefunction(tool):
+                        with progress_suppressed():
+                            result = await tool(**args)
+                    else:
+                        result = await call_with_retry(lambda: tool(**args))
+                    job = result.get("job") if isinstance(result, dict) else None
+                    if step.get("wait") and job and job.get("status") == "in_progress":
+                        poller = job_pollers.get(step["tool"])
+                        if poller is None:
+                            raise ValueError(
+                                f"Tool '{step['tool']}' does not start a job "
+                                "that can be waited for"
+                            )
+                        result = {"job": await wait_for_job(poller, job["id"])}
+                    results[step_id] = result
+                except Exception as e:
+                    errors[step_id] = describe_error(e)
+        finally:
+            finished[step_id].set()
+            completed += 1
+            await report_progress(
+                completed,
+                len(steps),
+                f"Step '{step_id}' done ({completed}/{len(steps)})",
+            )
+
+    await asyncio.gather(*(run(step) for step in steps))
+    return {
+        "results": {
+            step_id: results[step_id] for step_id in outputs if step_id in results
+        },
+        "errors": errors,
+    }
@@ -1,11 +1,35 @@
+import asyncio
+import base64
+import hashlib
+import json
+import threading
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
+import httpx
+import jwt
 import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
 from universal_mcp.utils.testing import (
     check_application_instance,
 )
 
 from universal_mcp_canva.app import CanvaApp
+from universal_mcp_canva.bulk import run_bulk
+from universal_mcp_canva.cache import ResponseCache
+from universal_mcp_canva.cassette import Cassette, CassetteMiss
+from universal_mcp_canva.catalog import BrandTemplateCatalog
+from universal_mcp_canva.concurrency import AdaptiveLimiter
+from universal_mcp_canva.downloads import DownloadManager
+from universal_mcp_canva.hedging import HedgePolicy
+from universal_mcp_canva.pipeline import Stage, run_pipeline
+from universal_mcp_canva.progress import progress_reporter
+from universal_mcp_canva.server import CanvaMCPServer
+from universal_mcp_canva.timeouts import EndpointTimeouts, endpoint_family
+from universal_mcp_canva.tracing import Tracer
+from universal_mcp_canva.webhooks import WebhookReceiver, WebhookVerificationError
+
 
 @pytest.fixture
 def app_instance():
@@ -15,3 +39,852 @@ def app_instance():
 
 def test_application(app_instance):
     check_application_instance(app_instance, app_name="canva")
+
+def test_webhook_invalidates_cached_design_reads(app_instance):
+    cache = ResponseCache()
+    app_instance.cache = cache
+    response = httpx.Response(200, json={"design": {"id": "D1"}})
+    cache.set(f"{app_instance.base_url}/v1/designs/D1", None, response)
+    cache.set(f"{app_instance.base_url}/v1/designs", {"query": "x"}, response)
+    cache.set(f"{app_instance.base_url}/v1/folders/F1/items", None, response)
+
+    summary = WebhookReceiver(app_instance).apply(
+        {"id": "n1", "content": {"type": "comment", "design": {"id": "D1"}}}
+    )
+
+    assert summary["design_ids"] == ["D1"]
+    assert summary["invalidated"] == 2
+    assert cache.get(f"{app_instance.base_url}/v1/folders/F1/items") is response
+
+def _signing_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = json.loads(
+        jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key())
+    )
+    return private_key, {**public_jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+def _notification(private_key, kid, notification_id):
+    return jwt.encode(
+        {"id": notification_id}, private_key, algorithm="RS256", headers={"kid": kid}
+    )
+
+def test_webhook_verify_picks_up_rotated_signing_keys():
+    old_key, old_jwk = _signing_key("k1")
+    new_key, new_jwk = _signing_key("k2")
+    served = [old_jwk]
+    fetches = []
+
+    def canva(request):
+        fetches.append(request.url.path)
+        return httpx.Response(200, json={"keys": list(served)})
+
+    app = CanvaApp(
+        integration=None,
+        cache=ResponseCache(ttl=None),
+        transport=httpx.MockTransport(canva),
+    )
+    receiver = WebhookReceiver(app, key_refresh_interval=0)
+    assert receiver.verify(_notification(old_key, "k1", "n1"))["id"] == "n1"
+
+    served[:] = [new_jwk]
+    assert receiver.verify(_notification(new_key, "k2", "n2"))["id"] == "n2"
+    assert fetches == ["/rest/v1/connect/keys", "/rest/v1/connect/keys"]
+    with pytest.raises(WebhookVerificationError, match="signature"):
+        receiver.verify(_notification(old_key, "k2", "n3"))
+
+def test_webhook_receiver_limits_key_refreshes_for_unknown_key_ids():
+    private_key, public_jwk = _signing_key("k1")
+    fetches = []
+
+    def canva(request):
+        fetches.append(request.url.path)
+        return httpx.Response(200, json={"keys": [public_jwk]})
+
+    receiver = WebhookReceiver(
+        CanvaApp(integration=None, transport=httpx.MockTransport(canva))
+    )
+    sent = []
+
+    async def post(body):
+        async def receive():
+            return {"body": body}
+
+        async def send(message):
+            sent.append(message)
+
+        await receiver({"type": "http", "method": "POST"}, receive, send)
+        return sent[-2]["status"]
+
+    async def deliver_all():
+        return [
+            await post(_notification(private_key, f"forged-{i}", "n").encode())
+            for i in range(5)
+        ]
+
+    assert asyncio.run(deliver_all()) == [401] * 5
+    assert len(fetches) == 1
+    assert asyncio.run(post(_notification(private_key, "k1", "n1").encode())) == 200
+    assert receiver.rejected == 5 and receiver.received == 1
+
+def test_webhook_endpoint_refuses_large_bodies_and_answers_503_without_keys():
+    private_key, _ = _signing_key("k1")
+    fetches = []
+
+    def canva(request):
+        fetches.append(request.url.path)
+        return httpx.Response(500, json={"message": "unavailable"})
+
+    app = CanvaApp(integration=None, transport=httpx.MockTransport(canva))
+    receiver = WebhookReceiver(app, max_body_size=4096)
+
+    async def post(chunks, headers=()):
+        messages = [{"body": chunk, "more_body": True} for chunk in chunks]
+        messages[-1]["more_body"] = False
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await receiver(
+            {"type": "http", "method": "POST", "headers": list(headers)}, receive, send
+        )
+        return sent[0]["status"]
+
+    assert asyncio.run(post([b"x"] * 10, [(b"content-length", b"100000")])) == 413
+    assert asyncio.run(post([b"x" * 3000, b"x" * 3000])) == 413
+    assert fetches == []
+    assert asyncio.run(post([_notification(private_key, "k1", "n1").encode()])) == 503
+    assert fetches == ["/rest/v1/connect/keys"]
+
+def test_cache_reads_through_and_writes_invalidate_affected_reads():
+    reads = []
+
+    def canva(request):
+        if request.method == "GET":
+            reads.append(request.url.path)
+        return httpx.Response(200, json={"items": [], "comment": {"id": "C1"}})
+
+    app = CanvaApp(
+        integration=None, cache=ResponseCache(), transport=httpx.MockTransport(canva)
+    )
+    for _ in range(2):
+        app.v1_folders_folderid_items("F1")
+        app.v1_folders_folderid_items("F2")
+        app.v1_designs_designid_comments_commentid("D1", "C1")
+    assert len(reads) == 3
+
+    app.v1_folders_move(from_folder_id="F1", item_id="D1", to_folder_id="F2")
+    app.v1_comments_commentid_replies(
+        "C1", attached_to={"type": "design", "design_id": "D1"}, message="ok"
+    )
+    app.v1_folders_folderid_items("F1")
+    app.v1_folders_folderid_items("F2")
+    app.v1_designs_designid_comments_commentid("D1", "C1")
+    assert reads[3:] == [
+        "/rest/v1/folders/F1/items",
+        "/rest/v1/folders/F2/items",
+        "/rest/v1/designs/D1/comments/C1",
+    ]
+    assert app.metrics()["cache"]["hits"] == 3
+
+def test_batch_get_comments_groups_results_and_errors(app_instance):
+    def fake_get(design_id, comment_id):
+        if comment_id == "bad":
+            request = httpx.Request("GET", "https://api.canva.com")
+            raise httpx.HTTPStatusError(
+                "missing",
+                request=request,
+                response=httpx.Response(404, request=request),
+            )
+        return {
+            "comment": {
+                "id": comment_id,
+                "message": "hi",
+                "author": {"display_name": "Ann"},
+            }
+        }
+
+    app_instance.v1_designs_designid_comments_commentid = fake_get
+    result = asyncio.run(
+        app_instance.batch_get_comments(
+            [
+                {"design_id": "D1", "comment_id": "C1"},
+                {"design_id": "D1", "comment_id": "C2"},
+                {"design_id": "D2", "comment_id": "bad"},
+            ]
+        )
+    )
+
+    assert result["designs"] == {
+        "D1": [
+            {"id": "C1", "message": "hi", "author": "Ann"},
+            {"id": "C2", "message": "hi", "author": "Ann"},
+        ]
+    }
+    assert result["fetched"] == 2
+    assert result["errors"][0]["comment_id"] == "bad"
+
+def test_batch_reply_to_comments_retries_rate_limits_and_reports_failures():
+    posted = []
+    throttled = set()
+
+    def canva(request):
+        comment_id = request.url.path.split("/")[-2]
+        body = json.loads(request.content)
+        if comment_id == "C2" and comment_id not in throttled:
+            throttled.add(comment_id)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        if comment_id == "missing":
+            return httpx.Response(404, json={"message": "not found"})
+        posted.append((comment_id, body["attached_to"]["design_id"], body["message"]))
+        return httpx.Response(200, json={"comment": {"id": f"R{len(posted)}"}})
+
+    app = CanvaApp(integration=None, transport=httpx.MockTransport(canva))
+    result = asyncio.run(
+        app.batch_reply_to_comments(
+            [
+                {"design_id": "D1", "comment_id": "C1", "message": "Done"},
+                {"design_id": "D1", "comment_id": "C2", "message": "Fixed"},
+                {"design_id": "D2", "comment_id": "missing", "message": "?"},
+            ],
+            max_concurrency=1,
+        )
+    )
+
+    assert sorted(posted) == [("C1", "D1", "Done"), ("C2", "D1", "Fixed")]
+    assert set(result["replies"]) == {"C1", "C2"}
+    assert result["posted"] == len(posted)
+    (error,) = result["errors"]
+    assert error["comment_id"] == "missing" and error["error"].startswith("HTTP 404")
+    with pytest.raises(ValueError, match="message"):
+        asyncio.run(
+            app.batch_reply_to_comments([{"design_id": "D1", "comment_id": "C1"}])
+        )
+
+def test_pipeline_overlaps_stages_and_reports_failures():
+    async def double(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    async def reject_odd_inputs(value):
+        if value % 4:
+            raise ValueError("odd input")
+        return value + 1
+
+    records, stats = asyncio.run(
+        run_pipeline(
+            range(5),
+            [
+                Stage("double", double, workers=2, queue_size=1),
+                Stage("check", reject_odd_inputs, workers=1, queue_size=1),
+            ],
+        )
+    )
+
+    assert [record.get("result") for record in records] == [1, None, 5, None, 9]
+    assert records[1]["stage"] == "check"
+    assert stats["stages"]["double"]["processed"] == 5
+    assert stats["stages"]["check"]["failed"] == 2
+
+def test_batch_designs_from_images_uploads_creates_and_exports_each_file(
+    tmp_path, monkeypatch
+):
+    files = []
+    for name in ("logo", "banner", "broken"):
+        path = tmp_path / f"{name}.png"
+        path.write_bytes(b"\x89PNG" + name.encode())
+        files.append(str(path))
+
+    def canva(request):
+        path = request.url.path.removeprefix("/rest")
+        if path == "/v1/asset-uploads":
+            name = json.loads(request.headers["Asset-Upload-Metadata"])["name_base64"]
+            return httpx.Response(
+                200, json={"job": {"id": f"U-{name}", "status": "in_progress"}}
+            )
+        if path.startswith("/v1/asset-uploads/"):
+            asset_id = "A-" + base64.b64decode(path.rsplit("-", 1)[-1]).decode()
+            return httpx.Response(
+                200, json={"job": {"status": "success", "asset": {"id": asset_id}}}
+            )
+        if path == "/v1/designs":
+            body = json.loads(request.content)
+            if body["title"] == "broken":
+                return httpx.Response(400, json={"message": "unsupported image"})
+            return httpx.Response(
+                200, json={"design": {"id": body["asset_id"].replace("A-", "D-")}}
+            )
+        if path == "/v1/exports":
+            design_id = json.loads(request.content)["design_id"]
+            urls = [f"https://x/{design_id}.pdf"]
+            return httpx.Response(
+                200, json={"job": {"status": "success", "urls": urls}}
+            )
+        return httpx.Response(404)
+
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+    app = CanvaApp(integration=None, transport=httpx.MockTransport(canva))
+    result = asyncio.run(app.batch_designs_from_images(files, upload_workers=2))
+
+    logo, banner, broken = result["results"]
+    assert logo == {
+        "file": files[0],
+        "asset_id": "A-logo",
+        "design_id": "D-logo",
+        "urls": ["https://x/D-logo.pdf"],
+    }
+    assert banner["urls"] == ["https://x/D-banner.pdf"]
+    assert broken["stage"] == "create" and broken["error"].startswith("HTTP 400")
+    assert result["stats"]["stages"]["upload"]["processed"] == len(files)
+    assert result["stats"]["stages"]["export"]["processed"] == len(files) - 1
+
+def test_endpoint_timeouts_and_hedged_get():
+    assert endpoint_family("https://api.canva.com/rest/v1/exports/E1") == "exports"
+    assert endpoint_family("https://export-download.canva.com/file.pdf") == "other"
+    timeouts = EndpointTimeouts(
+        default=5.0, overrides={"exports": httpx.Timeout(20.0, connect=2.0)}
+    )
+    request = httpx.Request("GET", "https://api.canva.com/rest/v1/exports/E1")
+    timeouts.apply(request)
+    assert request.extensions["timeout"] == {
+        "connect": 2.0,
+        "read": 20.0,
+        "write": 20.0,
+        "pool": 20.0,
+    }
+
+    calls = []
+    lock = threading.Lock()
+
+    def first_call_stalls():
+        with lock:
+            calls.append(None)
+            stalled = len(calls) == 1
+        if stalled:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    policy = HedgePolicy(initial_delay=0.05, max_hedge_ratio=1.0)
+    assert policy.run("designs", first_call_stalls) == "fast"
+    assert policy.stats()["designs"]["hedged"] == 1
+    assert policy.stats()["designs"]["hedge_wins"] == 1
+
+    # Requests beyond the pool run on their callers' threads, not queued as hedges.
+    saturated = HedgePolicy(initial_delay=0.05, max_workers=2, max_hedge_ratio=1.0)
+    callers = [
+        threading.Thread(
+            target=saturated.run, args=("designs", lambda: time.sleep(0.02))
+        )
+        for _ in range(16)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert saturated.stats()["designs"]["requests"] == 16
+    assert saturated.stats()["designs"]["hedged"] == 0
+
+    unbudgeted = HedgePolicy(initial_delay=0.01, max_hedge_ratio=0.0)
+    assert unbudgeted.run("designs", lambda: time.sleep(0.05) or "slow") == "slow"
+    assert unbudgeted.stats()["designs"]["hedges_skipped"] == 1
+
+def test_cassette_records_redacted_and_replays(tmp_path):
+    signed = "https://export-download.canva.com/D1.pdf?X-Amz-Signature=sig-secret&X-Amz-Expires=600"
+
+    def canva(request):
+        if request.url.host == "export-download.canva.com":
+            return httpx.Response(200, content=b"%PDF")
+        return httpx.Response(
+            200, json={"design": {"id": "D1", "thumbnail": {"url": signed}}}
+        )
+
+    cassette = Cassette(tmp_path / "canva.jsonl.gz")
+    recorder = cassette.recorder(transport=httpx.MockTransport(canva))
+    app = CanvaApp(integration=None, transport=recorder)
+    app._get_headers = lambda: {"Authorization": "Bearer secret"}
+    assert app.v1_designs_designid("D1")["design"]["thumbnail"]["url"] == signed
+    assert app.client.get(signed).content == b"%PDF"
+    recorder.close()
+
+    interaction, download = cassette.load()
+    assert interaction["request_headers"]["authorization"] == "REDACTED"
+    assert "secret" not in str(interaction) and "sig-secret" not in str(download)
+    assert "X-Amz-Signature=REDACTED&X-Amz-Expires=600" in download["url"]
+
+    replay = CanvaApp(integration=None, transport=cassette.player())
+    assert (
+        replay.client.get(signed.replace("sig-secret", "other-signature")).content
+        == b"%PDF"
+    )
+    assert replay.v1_designs_designid("D1")["design"]["id"] == "D1"
+    assert replay.v1_designs_designid("D1")["design"]["id"] == "D1"
+    with pytest.raises(CassetteMiss):
+        replay.v1_designs_designid("D2")
+
+def test_cassette_is_readable_when_the_recorder_is_never_closed(tmp_path):
+    def canva(request):
+        return httpx.Response(
+            200, json={"design": {"id": request.url.path.rsplit("/", 1)[-1]}}
+        )
+
+    path = tmp_path / "canva.jsonl.gz"
+    app = CanvaApp(
+        integration=None,
+        transport=Cassette(path).recorder(transport=httpx.MockTransport(canva)),
+    )
+    app.v1_designs_designid("D1")
+    app.v1_designs_designid("D2")
+    assert [interaction["url"] for interaction in Cassette(path).load()] == [
+        "https://api.canva.com/rest/v1/designs/D1",
+        "https://api.canva.com/rest/v1/designs/D2",
+    ]
+
+    # A process killed mid-write leaves a truncated last member; whole lines survive.
+    path.write_bytes(path.read_bytes()[:-10])
+    assert len(Cassette(path).load()) == 1
+
+def test_run_workflow_resolves_references_and_returns_final_results(app_instance):
+    def v1_designs(query=None, **kwargs):
+        return {"items": [{"id": f"{query}-1"}]}
+
+    def v1_designs_designid(designId):
+        return {"design": {"id": designId, "title": "Report"}}
+
+    def v1_exports(design_id=None, format=None):
+        return {"job": {"id": "E1", "status": "in_progress"}}
+
+    def v1_exports_exportid(exportId):
+        return {"job": {"id": exportId, "status": "success", "urls": ["u"]}}
+
+    for tool in (v1_designs, v1_designs_designid, v1_exports, v1_exports_exportid):
+        setattr(app_instance, tool.__name__, tool)
+
+    result = asyncio.run(
+        app_instance.run_workflow(
+            [
+                {"id": "search", "tool": "v1_designs", "args": {"query": "q3"}},
+                {
+                    "id": "get",
+                    "tool": "v1_designs_designid",
+                    "args": {"designId": "${search.items.0.id}"},
+                },
+                {
+                    "id": "export",
+                    "tool": "v1_exports",
+                    "wait": True,
+                    "args": {
+                        "design_id": "${search.items.0.id}",
+                        "format": {"type": "pdf"},
+                    },
+                },
+            ]
+        )
+    )
+
+    assert result["errors"] == {}
+    assert result["results"]["get"] == {"design": {"id": "q3-1", "title": "Report"}}
+    assert result["results"]["export"]["job"]["urls"] == ["u"]
+    assert "search" not in result["results"]
+
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(
+            app_instance.run_workflow(
+                [
+                    {
+                        "id": "a",
+                        "tool": "v1_designs_designid",
+                        "args": {"designId": "${b.design.id}"},
+                    },
+                    {
+                        "id": "b",
+                        "tool": "v1_designs_designid",
+                        "args": {"designId": "${a.design.id}"},
+                    },
+                ]
+            )
+        )
+
+    with pytest.raises(ValueError, match="max_concurrency"):
+        asyncio.run(
+            app_instance.run_workflow(
+                [{"id": "search", "tool": "v1_designs", "args": {"query": "q3"}}],
+                max_concurrency=0,
+            )
+        )
+
+    with pytest.raises(ValueError, match="list of strings"):
+        asyncio.run(
+            app_instance.run_workflow(
+                [
+                    {"id": "search", "tool": "v1_designs", "args": {"query": "q3"}},
+                    {
+                        "id": "get",
+                        "tool": "v1_designs_designid",
+                        "args": {"designId": "D1"},
+                        "depends_on": "search",
+                    },
+                ]
+            )
+        )
+
+def test_export_design_reports_progress_until_done(app_instance, monkeypatch):
+    polls = iter(["in_progress", "success"])
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+
+    def v1_exports(design_id=None, format=None):
+        return {"job": {"id": "E1", "status": "in_progress"}}
+
+    def v1_exports_exportid(exportId):
+        return {"job": {"id": exportId, "status": next(polls), "urls": ["u"]}}
+
+    app_instance.v1_exports = v1_exports
+    app_instance.v1_exports_exportid = v1_exports_exportid
+    reports = []
+
+    async def collect(progress, total, message):
+        reports.append((progress, total))
+
+    async def export():
+        with progress_reporter(collect):
+            return await app_instance.export_design("D1")
+
+    result = asyncio.run(export())
+
+    assert result["job"]["urls"] == ["u"]
+    assert [total for _, total in reports] == [100, 100]
+    assert 0 < reports[0][0] < reports[1][0] == 100
+
+def test_server_forwards_tool_progress_only_when_client_asks_for_it(
+    app_instance, monkeypatch
+):
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+
+    def v1_exports(design_id=None, format=None):
+        return {"job": {"id": "E1", "status": "in_progress"}}
+
+    def v1_exports_exportid(exportId):
+        return {"job": {"id": exportId, "status": "success", "urls": ["u"]}}
+
+    app_instance.v1_exports = v1_exports
+    app_instance.v1_exports_exportid = v1_exports_exportid
+    server = CanvaMCPServer(app_instance=app_instance)
+    reports = []
+
+    async def report_progress(progress, total=None, message=None):
+        reports.append((progress, total, message))
+
+    def context(progress_token):
+        meta = SimpleNamespace(progressToken=progress_token)
+        return SimpleNamespace(
+            request_context=SimpleNamespace(meta=meta), report_progress=report_progress
+        )
+
+    monkeypatch.setattr(server, "get_context", lambda: context(None))
+    asyncio.run(server.call_tool("canva_export_design", {"design_id": "D1"}))
+    assert reports == []
+
+    monkeypatch.setattr(server, "get_context", lambda: context("token-1"))
+    asyncio.run(server.call_tool("canva_export_design", {"design_id": "D1"}))
+    assert reports[-1] == (100, 100, "Job E1 finished after 0s")
+
+def test_download_manager_splits_ranges_and_retries_failed_range(tmp_path, monkeypatch):
+    payload = bytes(range(256)) * 40
+    failed_once = set()
+
+    def server(request):
+        start, end = (
+            int(part)
+            for part in request.headers["Range"].removeprefix("bytes=").split("-")
+        )
+        if start == 4096 and start not in failed_once:
+            failed_once.add(start)
+            return httpx.Response(500)
+        return httpx.Response(
+            206,
+            content=payload[start : end + 1],
+            headers={
+                "Content-Range": f"bytes {start}-{end}/{len(payload)}",
+                "ETag": f'"{hashlib.md5(payload).hexdigest()}"',
+            },
+        )
+
+    manager = DownloadManager(
+        range_size=4096, range_threshold=4096, transport=httpx.MockTransport(server)
+    )
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: sleep(0))
+    (result,) = asyncio.run(
+        manager.download(["https://export.canva.com/a/design.pdf"], tmp_path)
+    )
+
+    assert result["size"] == len(payload)
+    assert result["ranges"] == 3
+    assert result["retries"] == 1
+    assert result["checksum_verified"] is True
+    assert (tmp_path / "design.pdf").read_bytes() == payload
+
+    (escaped,) = asyncio.run(
+        manager.download(
+            ["https://export.canva.com/a/..%2F..%2Fevil.pdf"], tmp_path / "out"
+        )
+    )
+    assert escaped["path"] == str(tmp_path / "out" / "evil.pdf")
+    assert "error" not in escaped
+
+def test_brand_template_catalog_search_uses_precomputed_fields(app_instance, tmp_path):
+    pages = {
+        None: {
+            "items": [{"id": "T1", "title": "Summer Sale Poster", "updated_at": 1}],
+            "continuation": "next",
+        },
+        "next": {"items": [{"id": "T2", "title": "Quarterly Report", "updated_at": 1}]},
+    }
+    datasets = {
+        "T1": {"dataset": {"headline": {"type": "text"}, "hero": {"type": "image"}}},
+        "T2": {"dataset": {"headline": {"type": "text"}, "revenue": {"type": "chart"}}},
+    }
+    dataset_calls = []
+
+    def v1_brand_templates_brandtemplateid_dataset(brandTemplateId):
+        dataset_calls.append(brandTemplateId)
+        return datasets[brandTemplateId]
+
+    def v1_brand_templates(continuation=None, **kwargs):
+        return pages[continuation]
+
+    app_instance.v1_brand_templates = v1_brand_templates
+    app_instance.v1_brand_templates_brandtemplateid_dataset = (
+        v1_brand_templates_brandtemplateid_dataset
+    )
+    catalog = BrandTemplateCatalog(app_instance, path=tmp_path / "catalog.json")
+
+    matches = asyncio.run(catalog.search(query="sumer poster", fields=["Headline"]))
+    assert [match["id"] for match in matches] == ["T1"]
+    assert matches[0]["fields"] == {"headline": "text", "hero": "image"}
+
+    matches = asyncio.run(catalog.search(fields=["headline", "revenue"]))
+    assert [match["id"] for match in matches] == ["T2"]
+
+    asyncio.run(catalog.refresh())
+    assert sorted(dataset_calls) == ["T1", "T2"]
+    assert (
+        BrandTemplateCatalog(app_instance, path=tmp_path / "catalog.json").stale
+        is False
+    )
+
+def test_brand_template_catalog_refreshes_once_and_bypasses_response_cache():
+    template = {"id": "T1", "title": "Summer Sale Poster", "updated_at": 1}
+    listings = []
+
+    def canva(request):
+        if request.url.path.endswith("/dataset"):
+            return httpx.Response(200, json={"dataset": {"headline": {"type": "text"}}})
+        listings.append(request.url.path)
+        return httpx.Response(200, json={"items": [dict(template)]})
+
+    app = CanvaApp(
+        integration=None,
+        cache=ResponseCache(ttl=None),
+        transport=httpx.MockTransport(canva),
+    )
+    catalog = app.brand_template_catalog
+
+    async def search_concurrently():
+        return await asyncio.gather(*(catalog.search(query="summer") for _ in range(3)))
+
+    assert all(
+        matches[0]["id"] == "T1" for matches in asyncio.run(search_concurrently())
+    )
+    assert len(listings) == 1
+
+    template.update(title="Winter Sale Poster", updated_at=2)
+    asyncio.run(catalog.refresh())
+    assert len(listings) == 2
+    assert (
+        asyncio.run(catalog.search(query="winter"))[0]["title"] == "Winter Sale Poster"
+    )
+
+def test_brand_template_catalog_retries_datasets_that_failed_to_refresh():
+    template = {"id": "T1", "title": "Menu", "updated_at": 1}
+    dataset = {"dataset": {"dish": {"type": "text"}}}
+    failures = []
+
+    def canva(request):
+        if request.url.path.endswith("/dataset"):
+            if failures:
+                failures.pop()
+                return httpx.Response(500)
+            return httpx.Response(200, json=dataset)
+        return httpx.Response(200, json={"items": [dict(template)]})
+
+    app = CanvaApp(integration=None, transport=httpx.MockTransport(canva))
+    catalog = app.brand_template_catalog
+    asyncio.run(catalog.refresh())
+
+    template["updated_at"] = 2
+    dataset["dataset"]["price"] = {"type": "text"}
+    failures.append(None)
+    assert asyncio.run(catalog.refresh())["datasets_failed"] == 1
+    assert asyncio.run(catalog.search(fields=["price"])) == []
+
+    assert asyncio.run(catalog.refresh())["datasets_fetched"] == 1
+    matches = asyncio.run(catalog.search(fields=["price"]))
+    assert [match["id"] for match in matches] == ["T1"]
+
+def test_tracer_breaks_calls_into_phases_without_parameter_values():
+    def canva(request):
+        return httpx.Response(200, json={"items": []})
+
+    tracer = Tracer(slowest=1)
+    app = CanvaApp(
+        integration=None, transport=httpx.MockTransport(canva), tracer=tracer
+    )
+    app.v1_folders_folderid_items("FAF123secret", continuation="token-value")
+    app.v1_designs_designid("DAF456")
+
+    report = app.metrics()["tracing"]
+    assert report["traced"] == 2
+    (slowest,) = report["slowest"]
+    assert slowest["route"] in {"/v1/folders/{id}/items", "/v1/designs/{id}"}
+    assert "decode" in slowest["phases"]
+    assert "secret" not in str(report) and "token-value" not in str(report)
+
+    def no_content(request):
+        return httpx.Response(204)
+
+    tracer = Tracer()
+    app = CanvaApp(
+        integration=None, transport=httpx.MockTransport(no_content), tracer=tracer
+    )
+    app._delete(f"{app.base_url}/v1/folders/FAF123")
+    (deleted,) = tracer.report()["slowest"]
+    assert deleted["status"] == 204 and deleted["method"] == "DELETE"
+    assert "decode" not in deleted["phases"]
+
+    tracer = Tracer()
+    app = CanvaApp(
+        integration=None,
+        cache=ResponseCache(),
+        transport=httpx.MockTransport(canva),
+        tracer=tracer,
+    )
+    for _ in range(3):
+        app.v1_designs_designid("DAF456")
+    assert tracer.report()["traced"] == 1
+
+def test_adaptive_limiter_grows_when_saturated_and_backs_off_on_429():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=8)
+    for _ in range(20):
+        limiter.acquire("exports")
+        limiter.acquire("exports")
+        limiter.release("exports", 0.1)
+        limiter.release("exports", 0.1)
+    grown = limiter.stats()["exports"]["limit"]
+    assert grown > 2
+
+    request = httpx.Request("POST", "https://api.canva.com/rest/v1/exports")
+    with pytest.raises(httpx.HTTPStatusError):
+        with limiter.slot("exports"):
+            raise httpx.HTTPStatusError(
+                "throttled",
+                request=request,
+                response=httpx.Response(429, request=request),
+            )
+
+    stats = limiter.stats()["exports"]
+    assert stats["limit"] == pytest.approx(grown / 2, abs=0.01)
+    assert stats["throttled"] == 1
+    assert stats["in_flight"] == 0
+    assert "designs" not in limiter.stats()
+
+    # Slow uploads and fast polls of one family each keep their own baseline.
+    mixed = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    uploads = [("POST /v1/asset-uploads", 2.0)] * 4
+    polls = [("GET /v1/asset-uploads/{id}", 0.05)] * 4
+    for _ in range(4):
+        for route, latency in uploads + polls:
+            mixed.acquire("asset-uploads")
+            mixed.release("asset-uploads", latency, route=route)
+    stats = mixed.stats()["asset-uploads"]
+    assert stats["limit"] == 8 and stats["decreases"] == 0
+    assert stats["baseline_latency_seconds"] == {
+        "POST /v1/asset-uploads": 2.0,
+        "GET /v1/asset-uploads/{id}": 0.05,
+    }
+
+def test_hedged_gets_wait_for_limiter_slots_before_the_hedge_clock_starts():
+    sent = []
+
+    def canva(request):
+        sent.append(request.url.path)
+        time.sleep(0.2)
+        return httpx.Response(200, json={"design": {"id": "D1"}})
+
+    app = CanvaApp(
+        integration=None,
+        transport=httpx.MockTransport(canva),
+        limiter=AdaptiveLimiter(initial_limit=1, max_limit=1),
+        hedging=HedgePolicy(initial_delay=0.3, max_hedge_ratio=1.0),
+    )
+    callers = [
+        threading.Thread(target=app.v1_designs_designid, args=(f"D{i}",))
+        for i in range(4)
+    ]
+    for caller in callers:
+        caller.start()
+    for caller in callers:
+        caller.join()
+    assert len(sent) == len(callers)
+    assert app.metrics()["hedging"]["designs"]["hedged"] == 0
+
+    # A slow request whose hedge cannot get a limiter slot right away is not hedged.
+    app.hedging = HedgePolicy(initial_delay=0.05, max_hedge_ratio=1.0)
+    app.v1_designs_designid("D9")
+    stats = app.metrics()["hedging"]["designs"]
+    assert stats["hedged"] == 0 and stats["hedges_skipped"] == 1
+    assert app.metrics()["concurrency"]["designs"]["in_flight"] == 0
+
+def _bulk_app():
+    def canva(request):
+        return httpx.Response(
+            200, json={"design": {"id": request.url.path.rsplit("/", 1)[-1]}}
+        )
+
+    return CanvaApp(integration=None, transport=httpx.MockTransport(canva))
+
+def test_bulk_runner_shards_manifest_and_resumes_from_results(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    jobs = [
+        {"id": f"job-{i}", "tool": "v1_designs_designid", "args": {"designId": f"D{i}"}}
+        for i in range(6)
+    ]
+    jobs.append({"id": "job-bad", "tool": "no_such_tool"})
+    manifest.write_text("\n".join(json.dumps(job) for job in jobs))
+    results = tmp_path / "results.jsonl"
+    results.write_text(json.dumps({"id": "job-0", "ok": True, "result": {}}) + "\n")
+
+    summary = run_bulk(
+        manifest,
+        results,
+        workers=2,
+        concurrency=2,
+        rate=100,
+        app_factory=f"{__name__}:_bulk_app",
+    )
+
+    assert summary["skipped"] == 1
+    assert (summary["succeeded"], summary["failed"], summary["unfinished"]) == (5, 1, 0)
+    recorded = {
+        line["id"]: line for line in map(json.loads, results.read_text().splitlines())
+    }
+    assert recorded["job-5"]["result"] == {"design": {"id": "D5"}}
+    assert "no_such_tool" in recorded["job-bad"]["error"]
+    rerun = run_bulk(manifest, results, workers=2, app_factory=f"{__name__}:_bulk_app")
+    assert rerun["submitted"] == 1